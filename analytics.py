@@ -0,0 +1,93 @@
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from snapshot import MISSING
+from storage import PAYMENT_TYPES
+from transaction_log import to_epoch
+
+SECONDS_PER_DAY = 86400
+
+
+def sales_report(columns, start_date=None, end_date=None, top_n=10):
+    # Semua angka dihitung dengan operasi vektor NumPy atas kolom snapshot (lihat snapshot.py),
+    # tanpa loop Python per transaksi
+    sale_time = np.asarray(columns.columns["waktu_penjualan"], dtype=np.int64)
+    mask = sale_time != MISSING
+    if start_date is not None:
+        mask &= sale_time >= to_epoch(start_date)
+    if end_date is not None:
+        mask &= sale_time < to_epoch(end_date + timedelta(days=1))
+
+    sale_time = sale_time[mask]
+    names = np.asarray(columns.columns["nama"], dtype=np.int64)[mask]
+    sales = np.asarray(columns.columns["harga"], dtype=np.int64)[mask]
+    cost = np.asarray(columns.columns["modal"], dtype=np.int64)[mask]
+    quantity = np.asarray(columns.columns["jumlah"], dtype=np.int64)[mask]
+    payment = np.asarray(columns.columns["pembayaran"], dtype=np.int64)[mask]
+    profit = sales - cost
+
+    def total_by(groups, values, length):
+        return np.bincount(groups, weights=values, minlength=length).round().astype(np.int64)
+
+    name_count = len(columns.names)
+    product_sales = total_by(names, sales, name_count)
+    product_profit = total_by(names, profit, name_count)
+    product_units = total_by(names, quantity, name_count)
+    sold = np.flatnonzero(product_units)
+    top = sold[np.argsort(-product_sales[sold], kind="stable")[:top_n]]
+
+    hours = (sale_time % SECONDS_PER_DAY) // 3600
+    days, day_index = np.unique(sale_time // SECONDS_PER_DAY, return_inverse=True)
+    payment_sales = total_by(payment, sales, len(PAYMENT_TYPES) + 1)
+    payment_count = np.bincount(payment, minlength=len(PAYMENT_TYPES) + 1)
+
+    def product_entry(index):
+        return {"product": columns.names[index], "sales": int(product_sales[index]),
+                "profit": int(product_profit[index]), "units": int(product_units[index])}
+
+    return {
+        "count": int(mask.sum()),
+        "sales": int(sales.sum()),
+        "cost": int(cost.sum()),
+        "profit": int(profit.sum()),
+        "units": int(quantity.sum()),
+        "products": [product_entry(index) for index in sold],
+        "top_products": [product_entry(index) for index in top],
+        "hourly": [{"hour": hour, "sales": int(value)} for hour, value in enumerate(total_by(hours, sales, 24))],
+        "daily": [{"date": str(date(1970, 1, 1) + timedelta(days=int(day))), "sales": int(value),
+                   "profit": int(day_profit)}
+                  for day, value, day_profit in zip(days, total_by(day_index, sales, len(days)),
+                                                    total_by(day_index, profit, len(days)))],
+        # Indeks 0 = transaksi lama yang jenis pembayarannya belum tercatat
+        "payment": [{"payment_type": payment_type, "sales": int(payment_sales[code]), "count": int(payment_count[code])}
+                    for code, payment_type in enumerate(("tidak tercatat",) + PAYMENT_TYPES)],
+    }
+
+
+def _benchmark(row_count):
+    from snapshot import LoadedSnapshot
+
+    rng = np.random.default_rng(0)
+    start = to_epoch(date(2023, 1, 1))
+    sale_time = np.sort(rng.integers(start, start + 365 * SECONDS_PER_DAY, row_count))
+    columns = {
+        "waktu_masuk": sale_time,
+        "nama": rng.integers(0, 5000, row_count),
+        "harga": rng.integers(1, 100, row_count) * 500,
+        "jumlah": rng.integers(1, 5, row_count),
+        "modal": rng.integers(1, 100, row_count) * 400,
+        "waktu_penjualan": sale_time,
+        "pembayaran": rng.integers(1, 3, row_count),
+    }
+    snapshot = LoadedSnapshot(row_count, columns, [f"Barang {i}" for i in range(5000)])
+    started = time.perf_counter()
+    report = sales_report(snapshot, date(2023, 3, 1), date(2023, 10, 31))
+    print(f"{row_count} baris, {report['count']} dalam rentang: {time.perf_counter() - started:.3f} detik")
+
+
+if __name__ == "__main__":
+    # python analytics.py [jumlah_baris]
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000)
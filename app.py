@@ -1,48 +1,155 @@
+import time
+STARTED = time.perf_counter()  # Titik nol pengukuran waktu start (--measure-startup)
+
 import tkinter as tk
 import tkinter.ttk as ttk
 from tkinter import messagebox
 from tkinter import filedialog
-import csv
+from tkinter import simpledialog
 import os
+import queue
+import sys
+import threading
 from datetime import datetime
-from tkcalendar import DateEntry
-import pandas as pd 
 from design_pattern import *
+from virtual_table import VirtualTable
+from sorting import SortEngine
+from exporter import StreamingExporter, chunked
+from cart import Cart
+from inventory_model import InventoryModel
+from search_index import ProductSearchIndex
+from sales_engine import SalesEngine
+from instrumentation import instrumented, metrics
+from write_behind import WriteBehindQueue
+
+# Aksi yang bisa dipilih untuk capture cProfile di jendela diagnostik
+PROFILED_ACTIONS = ("app.show_inventory", "app.sort_inventory", "app.add_product", "app.update_product", "app.delete_product",
+                    "app.sell", "app.checkout", "import_products", "app.show_transactions", "app.apply_date_filter", "app.sales_summary",
+                    "app.sales_report", "write_behind.flush", "export.xlsx", "export.csv", "export.parquet")
+
+# Urutan titik ukur saat start: modul dimuat, jendela dibuat, frame pertama tampil,
+# baris stok pertama terlihat, seluruh stok selesai dimuat
+STARTUP_MARKS = ("imports", "window", "first_frame", "first_rows", "inventory_loaded")
+INVENTORY_CHUNK_ROWS = 2000
+SEARCH_LIMIT = 200
+WRITE_STATUS_POLL_MS = 100
+
+class InventoryTableObserver(Observer):
+    # Menerapkan event InventoryModel ke tabel stok yang sudah ada, tanpa membangun ulang jendela
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+
+    def update(self, event):
+        table = self.app.inventory_table
+        model_rows = self.app.inventory_model.rows
+        kind, index, row = event[:3]
+        # Tabel yang sedang diurutkan atau menampilkan hasil pencarian memakai daftar sendiri;
+        # posisi baris dicari lewat objeknya
+        shared = table.rows is model_rows
+        if kind == "reset":
+            # Setelah impor: pencarian dan urutan yang sedang tampil tidak berlaku lagi
+            self.app.search_results = None
+            self.app.sort_columns = []
+            if self.app.search_var.get():
+                self.app.search_var.set("")
+            table.selected_index = None
+            table.set_rows(model_rows)
+            self.app.sort_engine.set_rows(model_rows)
+            return
+        if kind == "extend":
+            if self.app.search_results is not None:
+                # Pencarian diketik sebelum pemuatan selesai: potongan baru tidak ditempel ke hasil
+                # pencarian, tetapi pencariannya diulang dengan barang yang sudah dimuat
+                self.app.refresh_search()
+            elif not shared:
+                table.rows.extend(row)
+            table.refresh()
+            return
+        if kind == "insert":
+            if not shared:
+                index = 0  # Barang baru tampil paling atas
+                table.rows.insert(index, row)
+            table.row_inserted(index)
+        else:
+            if not shared:
+                index = next((i for i, candidate in enumerate(table.rows) if candidate is row), None)
+            if index is None:
+                pass  # Baris tidak termasuk hasil pencarian yang sedang tampil
+            elif kind == "remove":
+                if not shared:
+                    del table.rows[index]
+                table.row_removed(index)
+            elif event[3] is None:
+                table.refresh_row(index)
+            else:
+                table.refresh_cell(index, event[3])
+        # Key urutan yang di-cache tidak berlaku lagi untuk data yang berubah
+        self.app.sort_engine.set_rows(model_rows)
 
 class SalesApp:
-    def __init__(self):
-        self.file_handler = SingletonFileHandler()
+    def __init__(self, measure_startup=False):
+        self.measure_startup = measure_startup
+        self.startup_marks = {}
+        self.mark_startup("imports")
+        # Semua logika stok dan penjualan ada di SalesEngine; SalesApp hanya tampilan
+        self.engine = SalesEngine()
+        self.file_handler = self.engine.file_handler
         self.observer = Observer()
         self.observer.register(InventoryObserver())
         self.sort_order = {}
+        self.sort_columns = []
+        self.sort_engine = SortEngine()
+        # Perubahan langsung diterapkan ke model di memori; file ditulis oleh thread I/O
+        self.writer = WriteBehindQueue(self.file_handler)
+        # Perubahan stok diterapkan ke tabel lewat event model, bukan dengan membuat ulang jendela
+        self.inventory_model = InventoryModel(self.engine, self.writer)
+        # Indeks nama untuk kotak pencarian, ikut diperbarui oleh event model. Didaftarkan lebih
+        # dulu dari tabel, supaya pencarian ulang di observer tabel sudah memakai baris baru.
+        self.search_index = ProductSearchIndex()
+        self.inventory_model.register(self.search_index)
+        self.inventory_model.register(InventoryTableObserver(self))
+        self.search_results = None
+        self.cart = Cart()  # Keranjang untuk penjualan banyak barang sekaligus
         self.filtered_transactions = []  # Menyimpan transaksi yang difilter
+        self.filter_range = None  # Rentang tanggal filter terakhir
         self.show_inventory()
         
+    @instrumented("app.show_inventory")
     def show_inventory(self):
         self.inventory_window = tk.Tk()
         self.inventory_window.title("Kelola Stok Barang")
+        self.inventory_window.protocol("WM_DELETE_WINDOW", self.close_window)
+        self.cart_window = None
         
         self.style = ttk.Style()
         self.style.theme_use('clam')  # Menggunakan tema 'clam' yang lebih modern
         self.style.configure('Treeview', background='#D3D3D3', foreground='black', rowheight=25, fieldbackground='#D3D3D3')
         self.style.map('Treeview', background=[('selected', '#347083')])
         
-        self.inventory_tree = ttk.Treeview(self.inventory_window, columns=("Waktu Produk Masuk", "Nama Barang", "Harga", "Jumlah", "Modal"))
+        # Tabel virtual: hanya baris yang terlihat yang dibuat sebagai item Treeview
+        self.inventory_table = VirtualTable(self.inventory_window, columns=("Waktu Produk Masuk", "Nama Barang", "Harga", "Jumlah", "Modal", "ID Barang"))
+        self.inventory_tree = self.inventory_table.tree
         self.inventory_tree.heading("#0", text="No.")
-        self.inventory_tree.heading("#1", text="Waktu Produk Masuk")
-        self.inventory_tree.heading("#2", text="Nama Barang")
-        self.inventory_tree.heading("#3", text="Harga")
-        self.inventory_tree.heading("#4", text="Jumlah")
-        self.inventory_tree.heading("#5", text="Modal")
         
         for col in self.inventory_tree["columns"]:
             self.inventory_tree.heading(col, text=col, command=lambda _col=col: self.sort_inventory(_col))
+        self.inventory_tree.bind("<Shift-Button-1>", self.sort_inventory_multi)
 
-        inventory_data = self.load_inventory()
-        for i, item in enumerate(inventory_data, start=1):
-            self.inventory_tree.insert("", "end", text=str(i), values=item)
+        # Jendela ditampilkan dulu dengan tabel kosong; stok dimuat di thread latar
+        self.sort_engine.set_rows(self.inventory_model.rows)
+        self.inventory_table.set_rows(self.inventory_model.rows)
+        self.inventory_window.bind("<Map>", lambda event: self.mark_startup("first_frame"), add="+")
         
-        self.inventory_tree.pack(pady=10, padx=10, fill="both", expand=True)
+        search_frame = tk.Frame(self.inventory_window)
+        search_frame.pack(pady=(10, 0), padx=10, fill="x")
+        tk.Label(search_frame, text="Cari Barang:").pack(side="left")
+        self.search_var = tk.StringVar(self.inventory_window)
+        self.search_var.trace_add("write", lambda *args: self.search_inventory())
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=40)
+        self.search_entry.pack(side="left", padx=5)
+
+        self.inventory_table.pack(pady=10, padx=10, fill="both", expand=True)
         
         # Menyusun tombol secara rapi dengan menggunakan frame
         button_frame = tk.Frame(self.inventory_window)
@@ -57,58 +164,188 @@ class SalesApp:
         self.delete_product_btn = ttk.Button(button_frame, text="Hapus Barang", command=self.delete_product)
         self.delete_product_btn.pack(side="left", padx=5)
 
+        self.import_products_btn = ttk.Button(button_frame, text="Impor Barang", command=self.import_products)
+        self.import_products_btn.pack(side="left", padx=5)
+
         self.sell_cash_product_btn = ttk.Button(button_frame, text="Jual Barang (Tunai)", command=lambda: self.sell_product_with_payment_type("tunai"))
         self.sell_cash_product_btn.pack(side="left", padx=5)
         
         self.sell_credit_product_btn = ttk.Button(button_frame, text="Jual Barang (Kartu Kredit)", command=lambda: self.sell_product_with_payment_type("kartu kredit"))
         self.sell_credit_product_btn.pack(side="left", padx=5)
         
+        self.add_to_cart_btn = ttk.Button(button_frame, text="Tambah ke Keranjang", command=self.add_to_cart)
+        self.add_to_cart_btn.pack(side="left", padx=5)
+
+        self.show_cart_btn = ttk.Button(button_frame, text="Keranjang", command=self.show_cart)
+        self.show_cart_btn.pack(side="left", padx=5)
+        
         self.view_transactions_btn = ttk.Button(button_frame, text="Lihat Riwayat Transaksi", command=self.show_transactions)
         self.view_transactions_btn.pack(side="left", padx=5)
 
+        self.diagnostics_btn = ttk.Button(button_frame, text="Diagnostik", command=self.show_diagnostics)
+        self.diagnostics_btn.pack(side="left", padx=5)
+
+        # Status penyimpanan write-behind: jumlah perubahan yang belum tertulis ke file
+        self.write_status_var = tk.StringVar(self.inventory_window, value="Semua perubahan tersimpan")
+        tk.Label(self.inventory_window, textvariable=self.write_status_var, anchor="w").pack(padx=10, pady=(0, 5), fill="x")
+        self.poll_write_status()
+
+        self.mark_startup("window")
+        self.start_inventory_load()
+
+    def mark_startup(self, name):
+        # Hanya kemunculan pertama yang dicatat (<Map> juga terpicu oleh jendela anak)
+        if name in self.startup_marks:
+            return
+        elapsed = time.perf_counter() - STARTED
+        self.startup_marks[name] = elapsed
+        metrics.record("startup." + name, elapsed)
+        if self.measure_startup and name == STARTUP_MARKS[-1]:
+            for mark in STARTUP_MARKS:
+                if mark in self.startup_marks:
+                    print(f"{mark:18} {self.startup_marks[mark] * 1000:9.1f} ms")
+            print(f"{len(self.inventory_model.rows)} barang dimuat")
+            self.inventory_window.after(0, self.close_window)
+
+    def poll_write_status(self):
+        if not self.inventory_window.winfo_exists():
+            return
+        self.writer.run_callbacks()
+        failures = self.writer.take_failures()
+        if failures:
+            details = "\n".join(f"- {description}: {error}" for description, error in failures[:10])
+            messagebox.showerror("Error", f"{len(failures)} perubahan gagal disimpan:\n{details}\n\nData stok dimuat ulang dari file.")
+            self.inventory_model.reload()
+        pending = self.writer.pending_count()
+        if pending:
+            self.write_status_var.set(f"Menyimpan {pending} perubahan...")
+        elif self.writer.last_flush is not None:
+            finished, duration, count = self.writer.last_flush
+            self.write_status_var.set(f"Semua perubahan tersimpan ({count} perubahan, {duration * 1000:.0f} ms, "
+                                      f"{datetime.fromtimestamp(finished):%H:%M:%S})")
+        self.inventory_window.after(WRITE_STATUS_POLL_MS, self.poll_write_status)
+
+    def close_window(self):
+        # Antrean write-behind disimpan dan callback-nya (mis. ID barang yang baru ditambahkan)
+        # dijalankan selagi tabel masih ada, baru jendela ditutup
+        self.writer.close()
+        self.writer.run_callbacks()
+        failures = self.writer.take_failures()
+        if failures:
+            details = "\n".join(f"- {description}: {error}" for description, error in failures[:10])
+            messagebox.showerror("Error", f"{len(failures)} perubahan gagal disimpan:\n{details}")
+        self.inventory_window.destroy()
+
+    def close(self):
+        # Setelah mainloop selesai jendela sudah tidak ada: sisa antrean tetap disimpan, tetapi
+        # callback untuk model/tabel tidak dijalankan lagi
+        self.writer.close()
+        self.file_handler.close()
+
+    def start_inventory_load(self):
+        self.inventory_table.loading = True
+        self.inventory_table.refresh()
+        self.inventory_chunks = queue.Queue()
+        thread = threading.Thread(target=self.load_inventory_worker, args=(self.inventory_chunks,), daemon=True)
+        thread.start()
+        self.inventory_window.after(10, lambda: self.poll_inventory_load(self.inventory_chunks))
+
+    def load_inventory_worker(self, chunks):
+        # Berjalan di thread latar: hanya membaca file dan mengisi antrean, tanpa menyentuh Tk
+        try:
+            for chunk in self.engine.iter_inventory(INVENTORY_CHUNK_ROWS):
+                chunks.put(chunk)
+        except Exception as error:
+            chunks.put(error)
+        chunks.put(None)
+
+    def poll_inventory_load(self, chunks):
+        if chunks is not self.inventory_chunks or not self.inventory_window.winfo_exists():
+            return
+        # Beberapa potongan per giliran, supaya jendela tetap responsif selama pemuatan
+        for _ in range(10):
+            try:
+                chunk = chunks.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None or isinstance(chunk, Exception):
+                self.finish_inventory_load(chunk)
+                return
+            self.inventory_model.extend(chunk)
+            if "first_rows" not in self.startup_marks:
+                self.inventory_window.update_idletasks()
+                self.mark_startup("first_rows")
+        self.inventory_window.after(10, lambda: self.poll_inventory_load(chunks))
+
+    def finish_inventory_load(self, error):
+        self.inventory_table.loading = False
+        # Cache urutan SortEngine dibuat ulang untuk data yang sudah lengkap
+        self.sort_engine.set_rows(self.inventory_model.rows)
+        self.inventory_table.refresh()
+        if error is not None:
+            messagebox.showerror("Error", f"Gagal memuat data stok: {error}")
+        self.mark_startup("inventory_loaded")
+
     def load_inventory(self):
-        inventory_data = []
-        with open(self.file_handler.inventory_file, "r") as file:
-            reader = csv.reader(file)
-            for row in reader:
-                inventory_data.append(row)
-        for x in inventory_data:
-            x[2] = int(x[2])
-            x[3] = int(x[3])
-            x[4] = int(x[4])
-        inventory_data[2:] = [list(x) for x in inventory_data[2:]]
-        return inventory_data
+        return self.engine.load_inventory()
     
-    def quicksort(self, arr, column_index, reverse=False):
-        if len(arr) <= 1:
-            return arr
-        
-        pivot = arr[len(arr) // 2]
-        left = [x for x in arr if x[column_index] < pivot[column_index]]
-        middle = [x for x in arr if x[column_index] == pivot[column_index]]
-        right = [x for x in arr if x[column_index] > pivot[column_index]]
-
-        if reverse:
-            return self.quicksort(right, column_index, reverse=True) + middle + self.quicksort(left, column_index, reverse=True)
-        else:
-            return self.quicksort(left, column_index) + middle + self.quicksort(right, column_index)
-        
-    def sort_inventory(self, column):
+    @instrumented("app.sort_inventory")
+    def sort_inventory(self, column, multi=False):
+        if self.inventory_table.loading:
+            return  # Urutan baru bisa dibuat setelah semua data stok dimuat
         column_index = self.inventory_tree["columns"].index(column)
-        inventory_data = self.load_inventory()
+        
+        # Shift+klik header menambah kolom urutan berikutnya (mis. nama lalu waktu masuk)
+        if not multi:
+            self.sort_columns = [column_index]
+        elif column_index not in self.sort_columns:
+            self.sort_columns.append(column_index)
         
         if column_index not in self.sort_order or self.sort_order[column_index] == "ascending":
-            sorted_data = self.quicksort(inventory_data, column_index)
+            reverse = False
             self.sort_order[column_index] = "descending"
         else:
-            sorted_data = self.quicksort(inventory_data, column_index, reverse=True)
+            reverse = True
             self.sort_order[column_index] = "ascending"
         
-        for i in self.inventory_tree.get_children():
-            self.inventory_tree.delete(i)
-        
-        for i, item in enumerate(sorted_data, start=1):
-            self.inventory_tree.insert("", "end", text=str(i), values=item)
+        # Data tidak dibaca ulang dari file; urutan diambil dari cache SortEngine.
+        # Saat ada pencarian, hanya hasil pencarian yang diurutkan.
+        self.inventory_table.selected_index = None
+        if self.search_results is not None:
+            self.inventory_table.set_rows(SortEngine(self.search_results).sorted_rows(self.sort_columns, reverse))
+        else:
+            self.inventory_table.set_rows(self.sort_engine.sorted_rows(self.sort_columns, reverse))
+
+    @instrumented("app.search_inventory")
+    def search_inventory(self):
+        query = self.search_var.get()
+        self.inventory_table.selected_index = None
+        self.sort_columns = []
+        if not query.strip():
+            self.search_results = None
+            self.inventory_table.set_rows(self.inventory_model.rows)
+        else:
+            # Prefiks nama/kata dulu, lalu nama yang mirip bila query kemungkinan salah ketik
+            self.search_results = self.search_index.search(query, limit=SEARCH_LIMIT)
+            self.inventory_table.set_rows(self.search_results)
+        self.inventory_table.scroll_to(0)
+
+    def refresh_search(self):
+        # Seperti search_inventory, tetapi posisi gulir dan barang yang dipilih tetap
+        selected = self.inventory_table.selected_row()
+        self.search_results = self.search_index.search(self.search_var.get(), limit=SEARCH_LIMIT)
+        self.inventory_table.selected_index = next(
+            (index for index, row in enumerate(self.search_results) if row is selected), None)
+        self.inventory_table.set_rows(self.search_results)
+
+    def sort_inventory_multi(self, event):
+        if self.inventory_tree.identify_region(event.x, event.y) != "heading":
+            return
+        column_id = self.inventory_tree.identify_column(event.x)
+        if column_id == "#0":
+            return "break"
+        self.sort_inventory(self.inventory_tree["columns"][int(column_id[1:]) - 1], multi=True)
+        return "break"
     
     def add_product(self):
         self.add_product_window = tk.Toplevel(self.inventory_window)
@@ -146,38 +383,23 @@ class SalesApp:
 
         product_data = (current_datetime, product, price, quantity, cost_price)
         valid = self.observer.notify(product_data)
-        print(valid)
         if not valid:
             return
-        # Ganti mode file ke "w" untuk menulis ulang seluruh isi file dengan data baru
-        with open(self.file_handler.inventory_file, "w", newline="") as file:
-            writer = csv.writer(file)
-
-            # Tambahkan data barang baru di awal
-            writer.writerow(product_data)
-
-            # Tulis ulang data barang yang sudah ada
-            for item in self.inventory_tree.get_children():
-                values = self.inventory_tree.item(item, "values")
-                writer.writerow(values)
+        # Barang baru disimpan lewat SalesEngine (backend CSV atau SQLite)
+        with metrics.timed("app.add_product"):
+            self.inventory_model.add_product(product, price, quantity, cost_price)
 
+        self.add_product_window.destroy()
         messagebox.showinfo("Info", "Produk berhasil ditambahkan.")
 
-        # Perbarui tampilan tabel stok barang
-        self.inventory_tree.delete(*self.inventory_tree.get_children())
-        self.inventory_window.destroy()
-        self.show_inventory()
-
     def update_product(self):
-        selected_item = self.inventory_tree.selection()
-        if not selected_item:
+        selected_product_data = self.inventory_table.selected_row()
+        if not selected_product_data:
             messagebox.showerror("Error", "Silakan pilih barang yang ingin diperbarui.")
             return
         
         self.update_product_window = tk.Toplevel(self.inventory_window)
         self.update_product_window.title("Perbarui Barang")
-        
-        selected_product_data = self.inventory_tree.item(selected_item, "values")
 
         self.product_name_label = tk.Label(self.update_product_window, text="Nama Barang:")
         self.product_name_label.grid(row=0, column=0, padx=5, pady=5)
@@ -203,125 +425,214 @@ class SalesApp:
         self.cost_price_entry.grid(row=3, column=1, padx=5, pady=5)
         self.cost_price_entry.insert(0, selected_product_data[4])  # Mengisi entry dengan harga modal barang yang dipilih
         
-        self.submit_update_btn = tk.Button(self.update_product_window, text="Simpan", command=lambda: self.save_updated_product(selected_item))
+        self.submit_update_btn = tk.Button(self.update_product_window, text="Simpan", command=lambda: self.save_updated_product(selected_product_data))
         self.submit_update_btn.grid(row=4, columnspan=2, padx=5, pady=5)
 
-    def save_updated_product(self, selected_item):
+    def save_updated_product(self, selected_product_data):
         product = self.product_name_entry.get()
         price = int(self.price_entry.get())
         quantity = int(self.quantity_entry.get())
         cost_price = int(self.cost_price_entry.get())
         
-        updated_product_data = (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), product, price, quantity, cost_price)
-        
-        updated_inventory = []
-        with open(self.file_handler.inventory_file, "r") as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if tuple(row) != tuple(self.inventory_tree.item(selected_item, "values")):
-                    updated_inventory.append(row)
-                else:
-                    updated_inventory.append(updated_product_data)
-        
-        with open(self.file_handler.inventory_file, "w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerows(updated_inventory)
+        try:
+            with metrics.timed("app.update_product"):
+                self.inventory_model.update_product(selected_product_data, product, price, quantity, cost_price)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
         
+        self.update_product_window.destroy()
         messagebox.showinfo("Info", "Barang berhasil diperbarui.")
-        
-        self.inventory_tree.delete(*self.inventory_tree.get_children())
-        self.inventory_window.destroy()
-        self.show_inventory()
 
 
     def sell_product_with_payment_type(self, payment_type):
-        selected_item = self.inventory_tree.selection()
-        if not selected_item:
+        product_data = self.inventory_table.selected_row()
+        if not product_data:
             messagebox.showerror("Error", "Silakan pilih item yang ingin dijual.")
             return
 
-        index = self.inventory_tree.index(selected_item)
-        product_data = self.inventory_tree.item(selected_item, "values")
-
         if int(product_data[3]) <= 0:
             messagebox.showerror("Error", "Stok barang habis.")
             return
 
-        transaction = TransactionFactory.create_transaction(payment_type, product_data[2])
-        
-        total_payment = transaction.calculate_total()
+        # Kurangi stok dan tambahkan item terjual ke riwayat transaksi dalam satu operasi
+        try:
+            with metrics.timed("app.sell"):
+                _, total_payment = self.inventory_model.sell(product_data, payment_type)
+        except ValueError:
+            messagebox.showerror("Error", "Stok barang habis.")
+            return
 
-        current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Tanggal dan waktu saat ini
+        # Hanya sel Jumlah barang ini yang digambar ulang; posisi gulir dan pilihan tetap
+        messagebox.showinfo("Info", f"Produk {product_data[1]} berhasil dijual.\nTotal Pembayaran: {total_payment}")
 
-        updated_inventory = []
-        with open(self.file_handler.inventory_file, "r") as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if tuple(row) != tuple(product_data):
-                    updated_inventory.append(row)
-                else:
-                    updated_inventory.append((row[0], row[1], row[2], int(row[3]) - 1, row[4]))
+    def add_to_cart(self):
+        product_data = self.inventory_table.selected_values()
+        if not product_data:
+            messagebox.showerror("Error", "Silakan pilih item yang ingin dimasukkan ke keranjang.")
+            return
 
-        with open(self.file_handler.inventory_file, "w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerows(updated_inventory)
+        quantity = simpledialog.askinteger("Keranjang", f"Jumlah {product_data[1]}:", parent=self.inventory_window, initialvalue=1, minvalue=1)
+        if quantity is None:
+            return
 
-        # Tambahkan item terjual ke riwayat transaksi
-        with open(self.file_handler.transactions_file, "a", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow((current_datetime, product_data[1], total_payment, 1, product_data[4], current_datetime))  # Menambahkan transaksi dengan waktu penjualan
+        try:
+            self.cart.add(product_data, quantity)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
+        self.refresh_cart()
 
-        messagebox.showinfo("Info", f"Produk {product_data[1]} berhasil dijual.\nTotal Pembayaran: {total_payment}")
+    def show_cart(self):
+        if getattr(self, "cart_window", None) is not None and self.cart_window.winfo_exists():
+            self.cart_window.lift()
+            return
 
-        self.inventory_tree.delete(*self.inventory_tree.get_children())
-        self.inventory_window.destroy()
-        self.show_inventory()
+        self.cart_window = tk.Toplevel(self.inventory_window)
+        self.cart_window.title("Keranjang")
+
+        self.cart_tree = ttk.Treeview(self.cart_window, columns=("Nama Barang", "Harga", "Jumlah", "Subtotal"), show="headings")
+        for col in self.cart_tree["columns"]:
+            self.cart_tree.heading(col, text=col)
+        self.cart_tree.pack(pady=10, padx=10, fill="both", expand=True)
+
+        self.cart_total_label = tk.Label(self.cart_window)
+        self.cart_total_label.pack(pady=5)
+
+        cart_button_frame = tk.Frame(self.cart_window)
+        cart_button_frame.pack(pady=5, padx=10, fill="x")
+
+        ttk.Button(cart_button_frame, text="Hapus Item", command=self.remove_from_cart).pack(side="left", padx=5)
+        ttk.Button(cart_button_frame, text="Checkout (Tunai)", command=lambda: self.checkout("tunai")).pack(side="left", padx=5)
+        ttk.Button(cart_button_frame, text="Checkout (Kartu Kredit)", command=lambda: self.checkout("kartu kredit")).pack(side="left", padx=5)
+
+        self.refresh_cart()
+
+    def refresh_cart(self):
+        if getattr(self, "cart_window", None) is None or not self.cart_window.winfo_exists():
+            return
+        self.cart_tree.delete(*self.cart_tree.get_children())
+        total = 0
+        for key, product_data, quantity in self.cart.lines():
+            subtotal = int(product_data[2]) * quantity
+            total += subtotal
+            self.cart_tree.insert("", "end", iid=key, values=(product_data[1], product_data[2], quantity, subtotal))
+        self.cart_total_label.config(text=f"Total: Rp {total}")
+
+    def remove_from_cart(self):
+        for item in self.cart_tree.selection():
+            self.cart.remove(item)
+        self.refresh_cart()
+
+    def checkout(self, payment_type):
+        if not self.cart.items:
+            messagebox.showerror("Error", "Keranjang masih kosong.")
+            return
+
+        items = [(product_data, quantity) for _, product_data, quantity in self.cart.lines()]
+
+        # Semua stok dikurangi dan semua transaksi ditulis dalam satu operasi
+        try:
+            with metrics.timed("app.checkout"):
+                transaction_rows, total_payment = self.inventory_model.checkout(items, payment_type)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
+
+        self.cart.clear()
+        self.refresh_cart()
+        messagebox.showinfo("Info", f"{len(transaction_rows)} barang berhasil dijual.\nTotal Pembayaran: {total_payment}")
 
 
     def delete_product(self):
-        selected_item = self.inventory_tree.selection()
-        if not selected_item:
+        selected_product_data = self.inventory_table.selected_row()
+        if not selected_product_data:
             messagebox.showerror("Error", "Silakan pilih barang yang ingin dihapus.")
             return
         
         confirmation = messagebox.askyesno("Konfirmasi", "Apakah Anda yakin ingin menghapus barang ini?")
         if confirmation:
-            selected_product_data = self.inventory_tree.item(selected_item, "values")
-            
-            updated_inventory = []
-            with open(self.file_handler.inventory_file, "r") as file:
-                reader = csv.reader(file)
-                for row in reader:
-                    if tuple(row) != tuple(selected_product_data):
-                        updated_inventory.append(row)
-            
-            with open(self.file_handler.inventory_file, "w", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerows(updated_inventory)
+            try:
+                with metrics.timed("app.delete_product"):
+                    self.inventory_model.delete_product(selected_product_data)
+            except ValueError as error:
+                messagebox.showerror("Error", str(error))
+                return
             
             messagebox.showinfo("Info", "Barang berhasil dihapus.")
-            
-            self.inventory_tree.delete(selected_item)
-            self.inventory_window.destroy()
-            self.show_inventory()
 
+    def import_products(self):
+        if self.inventory_table.loading:
+            messagebox.showinfo("Info", "Tunggu sampai data stok selesai dimuat.")
+            return
+        file_path = filedialog.askopenfilename(filetypes=[("Daftar harga", "*.csv *.xlsx"), ("CSV files", "*.csv"), ("Excel files", "*.xlsx")])
+        if not file_path:
+            return
+        self.inventory_window.config(cursor="watch")
+        self.inventory_window.update_idletasks()
+        try:
+            report = self.inventory_model.import_products(file_path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Error", f"Gagal mengimpor {os.path.basename(file_path)}: {error}")
+            return
+        finally:
+            self.inventory_window.config(cursor="")
+        self.show_import_report(report)
+
+    def show_import_report(self, report):
+        # Satu laporan untuk semua baris yang dilewati, bukan messagebox per baris
+        report_window = tk.Toplevel(self.inventory_window)
+        report_window.title(f"Laporan Impor {os.path.basename(report.file_path)}")
+        tk.Label(report_window, text=report.summary()).pack(padx=10, pady=(10, 0), anchor="w")
+
+        columns = ("Nama Barang", "Jenis", "Keterangan")
+        report_tree = ttk.Treeview(report_window, columns=columns, height=15)
+        report_tree.heading("#0", text="Baris")
+        report_tree.column("#0", width=70)
+        report_tree.column("Keterangan", width=320)
+        for col in columns:
+            report_tree.heading(col, text=col)
+        for kind, entries in (("kesalahan", report.errors), ("peringatan", report.warnings)):
+            for line_number, name, message in entries:
+                report_tree.insert("", "end", text=line_number, values=(name, kind, message))
+        report_tree.pack(padx=10, pady=10, fill="both", expand=True)
+
+        button_frame = tk.Frame(report_window)
+        button_frame.pack(pady=5, padx=10, fill="x")
+        ttk.Button(button_frame, text="Simpan Laporan", command=lambda: self.save_import_report(report, report_window)).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Tutup", command=report_window.destroy).pack(side="left", padx=5)
+
+    def save_import_report(self, report, report_window):
+        file_path = filedialog.asksaveasfilename(parent=report_window, defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        if not file_path:
+            return
+        report.save(file_path)
+        messagebox.showinfo("Info", f"Laporan impor disimpan ke {file_path}", parent=report_window)
+
+    @instrumented("app.show_transactions")
     def show_transactions(self):
         self.transactions_window = tk.Tk()
         self.transactions_window.title("Riwayat Transaksi")
         
-        self.transactions_tree = ttk.Treeview(self.transactions_window, columns=("Nama Barang", "Harga", "Jumlah", "Modal", "Waktu Penjualan"))
+        self.transactions_table = VirtualTable(self.transactions_window, columns=("Nama Barang", "Harga", "Jumlah", "Modal", "Waktu Penjualan", "Jenis Pembayaran"))
+        self.transactions_tree = self.transactions_table.tree
         self.transactions_tree.heading("#0", text="No.")
         self.transactions_tree.heading("#1", text="Nama Barang")
         self.transactions_tree.heading("#2", text="Harga")
         self.transactions_tree.heading("#3", text="Jumlah")
         self.transactions_tree.heading("#4", text="Modal")
         self.transactions_tree.heading("#5", text="Waktu Penjualan")
+        self.transactions_tree.heading("#6", text="Jenis Pembayaran")  # Kosong untuk transaksi lama
         
-        transactions_data = self.load_transactions()
-        for i, item in enumerate(transactions_data, start=1):
-            self.transactions_tree.insert("", "end", text=str(i), values=item[1:])  # Menghapus kolom pertama (Waktu Produk Masuk)
+        # Penjualan yang masih di antrean write-behind disimpan dulu agar ikut tampil
+        self.inventory_model.flush()
+        # Riwayat dibaca dari snapshot biner; baris teks hanya dibuat untuk baris yang terlihat
+        transactions_data = self.engine.load_transactions_view()
+        self.transactions_table.set_rows(transactions_data, display=lambda item: item[1:])  # Menghapus kolom pertama (Waktu Produk Masuk)
         
-        self.transactions_tree.pack(pady=10)
+        self.transactions_table.pack(pady=10, padx=10, fill="both", expand=True)
+
+        from tkcalendar import DateEntry  # hanya dibutuhkan jendela riwayat transaksi
 
         # Menambahkan frame untuk date picker dan tombol filter
         filter_frame = tk.Frame(self.transactions_window)
@@ -341,72 +652,205 @@ class SalesApp:
         self.calculate_sales_summary_btn = tk.Button(self.transactions_window, text="Hitung Rekapan Penjualan", command=self.calculate_sales_summary)
         self.calculate_sales_summary_btn.pack(pady=5)
 
+        self.sales_report_btn = tk.Button(self.transactions_window, text="Laporan Penjualan", command=self.show_sales_report)
+        self.sales_report_btn.pack(pady=5)
+
         # Menambahkan tombol ekspor ke Excel
         self.export_to_excel_btn = tk.Button(self.transactions_window, text="Ekspor ke Excel", command=self.export_to_excel)
         self.export_to_excel_btn.pack(pady=5)
 
+    @instrumented("app.apply_date_filter")
     def apply_date_filter(self):
         start_date = self.start_date_entry.get_date()
         end_date = self.end_date_entry.get_date()
 
-        self.filtered_transactions = []  # Reset filtered transactions
-        with open(self.file_handler.transactions_file, "r") as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if len(row) >= 6:
-                    transaction_date = datetime.strptime(row[5], "%Y-%m-%d %H:%M:%S").date()
-                    if start_date <= transaction_date <= end_date:
-                        self.filtered_transactions.append(row)
-
-        for i in self.transactions_tree.get_children():
-            self.transactions_tree.delete(i)
+        # Hanya partisi yang beririsan dengan rentang tanggal yang dibaca
+        self.inventory_model.flush()
+        self.filtered_transactions = self.engine.filter_transactions(start_date, end_date)
+        self.filter_range = (start_date, end_date)
 
-        for i, item in enumerate(self.filtered_transactions, start=1):
-            self.transactions_tree.insert("", "end", text=str(i), values=item[1:])  # Menghapus kolom pertama (Waktu Produk Masuk)
+        self.transactions_table.set_rows(self.filtered_transactions, display=lambda item: item[1:])  # Menghapus kolom pertama (Waktu Produk Masuk)
 
     def load_transactions(self):
-        transactions_data = []
-        with open(self.file_handler.transactions_file, "r") as file:
-            reader = csv.reader(file)
-            for row in reader:
-                transactions_data.append(row)
-        return transactions_data
+        return self.engine.load_transactions()
     
     def calculate_sales_summary(self):
-        total_sales = 0
-        total_cost = 0
-        
-        if not self.filtered_transactions:
+        if self.filter_range is None:
+            messagebox.showinfo("Info", "Tidak ada transaksi yang sesuai filter.")
+            return
+
+        # Rekap diambil dari prefix sum rollup harian, tanpa memindai ulang transaksi
+        self.inventory_model.flush()
+        with metrics.timed("app.sales_summary"):
+            summary = self.engine.sales_summary(*self.filter_range)
+        if summary["count"] == 0:
             messagebox.showinfo("Info", "Tidak ada transaksi yang sesuai filter.")
             return
         
-        for row in self.filtered_transactions:
-            total_sales += int(row[2])
-            total_cost += int(row[4])
-        
-        total_profit = total_sales - total_cost
-        
-        messagebox.showinfo("Info", f"Total Penjualan: Rp {total_sales}\nTotal Laba Bersih: Rp {total_profit}")
+        messagebox.showinfo("Info", f"Total Penjualan: Rp {summary['sales']}\nTotal Laba Bersih: Rp {summary['profit']}")
+
+    def show_sales_report(self):
+        # Laporan dihitung dari kolom snapshot dengan NumPy; tanpa filter berarti semua transaksi
+        start_date, end_date = self.filter_range or (None, None)
+        self.inventory_model.flush()
+        try:
+            with metrics.timed("app.sales_report"):
+                report = self.engine.sales_report(start_date, end_date)
+        except ImportError:
+            messagebox.showerror("Error", "Laporan penjualan membutuhkan NumPy.")
+            return
+        if report["count"] == 0:
+            messagebox.showinfo("Info", "Tidak ada transaksi yang sesuai filter.")
+            return
+
+        report_window = tk.Toplevel(self.transactions_window)
+        report_window.title("Laporan Penjualan")
+        tk.Label(report_window, text=f"Total Penjualan: Rp {report['sales']}   Total Laba Bersih: Rp {report['profit']}   "
+                                     f"Barang Terjual: {report['units']}").pack(padx=10, pady=5)
+        tk.Label(report_window, text="   ".join(f"{item['payment_type'].title()}: Rp {item['sales']} ({item['count']} transaksi)"
+                                               for item in report["payment"] if item["count"])).pack(padx=10, pady=5)
+
+        top_tree = ttk.Treeview(report_window, columns=("Penjualan", "Laba", "Terjual"), height=10)
+        top_tree.heading("#0", text="Barang Terlaris")
+        top_tree.heading("#1", text="Penjualan")
+        top_tree.heading("#2", text="Laba")
+        top_tree.heading("#3", text="Terjual")
+        for item in report["top_products"]:
+            top_tree.insert("", "end", text=item["product"], values=(item["sales"], item["profit"], item["units"]))
+        top_tree.pack(padx=10, pady=5, fill="both", expand=True)
+
+        hourly_tree = ttk.Treeview(report_window, columns=("Penjualan",), height=8)
+        hourly_tree.heading("#0", text="Jam")
+        hourly_tree.heading("#1", text="Penjualan")
+        for item in report["hourly"]:
+            if item["sales"]:
+                hourly_tree.insert("", "end", text=f"{item['hour']:02d}:00", values=(item["sales"],))
+        hourly_tree.pack(padx=10, pady=5, fill="both", expand=True)
 
     def export_to_excel(self):
         # Menentukan file untuk disimpan
-        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet"), ("All files", "*.*")])
         if not file_path:
             return
 
-        # Mengambil data transaksi saat ini
-        data = self.filtered_transactions if self.filtered_transactions else self.load_transactions()
+        # Data transaksi dibaca per potongan, bukan dimuat seluruhnya ke memori
+        self.inventory_model.flush()
+        try:
+            if self.filtered_transactions:
+                exporter = StreamingExporter(file_path, total=len(self.filtered_transactions))
+                chunks = chunked(self.filtered_transactions, 5000)
+            else:
+                exporter = StreamingExporter(file_path, total=self.file_handler.count_transactions())
+                chunks = self.file_handler.iter_transactions(5000)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
 
-        # Membuat dataframe dari data transaksi
-        df = pd.DataFrame(data, columns=["Waktu Produk Masuk", "Nama Barang", "Harga", "Jumlah", "Modal", "Waktu Penjualan"])
+        self.export_window = tk.Toplevel(self.transactions_window)
+        self.export_window.title("Ekspor Data")
+        self.export_label = tk.Label(self.export_window, text="Mengekspor...")
+        self.export_label.pack(padx=10, pady=5)
+        self.export_progress = ttk.Progressbar(self.export_window, length=300, maximum=max(exporter.total, 1))
+        self.export_progress.pack(padx=10, pady=5)
+        self.cancel_export_btn = ttk.Button(self.export_window, text="Batal", command=exporter.cancel)
+        self.cancel_export_btn.pack(pady=5)
+        self.export_window.protocol("WM_DELETE_WINDOW", exporter.cancel)
+
+        # Ekspor berjalan di thread terpisah; jendela Tk hanya memantau kemajuannya
+        exporter.start(chunks)
+        self.poll_export(exporter)
+
+    def poll_export(self, exporter):
+        self.export_progress["value"] = exporter.rows_written
+        self.export_label.config(text=f"Mengekspor {exporter.rows_written} dari {exporter.total} baris...")
+        if not exporter.finished.is_set():
+            self.export_window.after(100, lambda: self.poll_export(exporter))
+            return
 
-        # Menyimpan dataframe ke file Excel
-        df.to_excel(file_path, index=False)
-        messagebox.showinfo("Info", "Data berhasil diekspor ke Excel")
+        self.export_window.destroy()
+        if exporter.error is not None:
+            messagebox.showerror("Error", f"Ekspor gagal: {exporter.error}")
+        elif exporter.cancelled.is_set():
+            messagebox.showinfo("Info", "Ekspor dibatalkan.")
+        else:
+            messagebox.showinfo("Info", "Data berhasil diekspor ke Excel")
+
+    def show_diagnostics(self):
+        # Latensi, jumlah baris dan byte per operasi yang dicatat instrumentation.metrics
+        self.diagnostics_window = tk.Toplevel(self.inventory_window)
+        self.diagnostics_window.title("Diagnostik")
+
+        columns = ("Jumlah", "Rata-rata (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Maks (ms)", "Baris", "Byte Dibaca", "Byte Ditulis")
+        self.diagnostics_tree = ttk.Treeview(self.diagnostics_window, columns=columns, height=15)
+        self.diagnostics_tree.heading("#0", text="Operasi")
+        self.diagnostics_tree.column("#0", width=220)
+        for col in columns:
+            self.diagnostics_tree.heading(col, text=col)
+            self.diagnostics_tree.column(col, width=90, anchor="e")
+        self.diagnostics_tree.pack(padx=10, pady=10, fill="both", expand=True)
+
+        button_frame = tk.Frame(self.diagnostics_window)
+        button_frame.pack(pady=5, padx=10, fill="x")
+        ttk.Button(button_frame, text="Muat Ulang", command=self.refresh_diagnostics).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Reset", command=lambda: (metrics.reset(), self.refresh_diagnostics())).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Simpan ke File", command=self.dump_diagnostics).pack(side="left", padx=5)
+
+        profile_frame = tk.Frame(self.diagnostics_window)
+        profile_frame.pack(pady=5, padx=10, fill="x")
+        tk.Label(profile_frame, text="Profil cProfile untuk aksi:").pack(side="left")
+        self.profile_action = ttk.Combobox(profile_frame, values=PROFILED_ACTIONS, state="readonly", width=24)
+        self.profile_action.current(0)
+        self.profile_action.pack(side="left", padx=5)
+        ttk.Button(profile_frame, text="Profil Aksi Berikutnya", command=self.arm_profile).pack(side="left", padx=5)
+        ttk.Button(profile_frame, text="Lihat Profil", command=self.show_profile).pack(side="left", padx=5)
+
+        self.poll_diagnostics()
+
+    def poll_diagnostics(self):
+        # Diperbarui otomatis selama jendela terbuka
+        if not self.diagnostics_window.winfo_exists():
+            return
+        self.refresh_diagnostics()
+        self.diagnostics_window.after(2000, self.poll_diagnostics)
+
+    def refresh_diagnostics(self):
+        self.diagnostics_tree.delete(*self.diagnostics_tree.get_children())
+        for name, stats in metrics.snapshot().items():
+            self.diagnostics_tree.insert("", "end", text=name, values=(
+                stats["count"], f"{stats['mean_seconds'] * 1000:.2f}", f"{stats['p50_seconds'] * 1000:.2f}",
+                f"{stats['p95_seconds'] * 1000:.2f}", f"{stats['p99_seconds'] * 1000:.2f}", f"{stats['max_seconds'] * 1000:.2f}",
+                stats["rows"], stats["bytes_read"], stats["bytes_written"]))
+
+    def dump_diagnostics(self):
+        file_path = filedialog.asksaveasfilename(parent=self.diagnostics_window, defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        if not file_path:
+            return
+        metrics.dump(file_path)
+        messagebox.showinfo("Info", f"Data diagnostik disimpan ke {file_path}", parent=self.diagnostics_window)
+
+    def arm_profile(self):
+        action = self.profile_action.get()
+        metrics.profile_next(action)
+        messagebox.showinfo("Info", f"Aksi {action} berikutnya akan direkam dengan cProfile.", parent=self.diagnostics_window)
+
+    def show_profile(self):
+        action = self.profile_action.get()
+        if action not in metrics.profiles:
+            messagebox.showinfo("Info", f"Belum ada profil untuk {action}.", parent=self.diagnostics_window)
+            return
+        file_path, text = metrics.profiles[action]
+        profile_window = tk.Toplevel(self.diagnostics_window)
+        profile_window.title(f"Profil {action} ({file_path})")
+        profile_text = tk.Text(profile_window, width=120, height=40, font="TkFixedFont")
+        profile_text.insert("1.0", text)
+        profile_text.config(state="disabled")
+        profile_text.pack(fill="both", expand=True)
 
 def main():
-    app = SalesApp()
+    # python app.py --measure-startup: cetak waktu tiap tahap start lalu keluar
+    app = SalesApp(measure_startup="--measure-startup" in sys.argv)
     app.inventory_window.mainloop()
+    app.close()
 
 if __name__ == "__main__":
     main()
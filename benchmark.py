@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import datagen
+
+REPO_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return {"median": statistics.median(timings), "min": min(timings), "runs": len(timings)}, result
+
+
+def git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=REPO_DIRECTORY,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(inventory_rows, transaction_rows, repeat, sales, export_formats):
+    # Jalur data yang sama dengan tombol-tombol SalesApp, tanpa Tk; dijalankan pada data
+    # sintetis di folder sementara sehingga data asli tidak tersentuh
+    from design_pattern import SingletonFileHandler
+    from exporter import StreamingExporter
+    from sales_engine import SalesEngine
+    from sorting import SortEngine
+    from storage import migrate_csv_to_sqlite
+
+    original_directory = os.getcwd()
+    work_directory = tempfile.mkdtemp(prefix="salesapp-benchmark-")
+    results = {"inventory_rows": inventory_rows, "transaction_rows": transaction_rows}
+    try:
+        start = time.perf_counter()
+        datagen.generate(work_directory, inventory_rows, transaction_rows)
+        results["generate_seconds"] = time.perf_counter() - start
+        os.chdir(work_directory)
+        if os.environ.get("SALESAPP_STORAGE", "csv") == "sqlite":
+            migrate_csv_to_sqlite("inventory.csv", "transactions.csv", "sales.db")
+
+        # Partisi, snapshot dan rollup dibuat di thread latar pada pembukaan pertama, dan diukur
+        # terpisah sampai selesai
+        results["startup"], engine = measure(lambda: SalesEngine(SingletonFileHandler()), 1)
+        results["index_build"], _ = measure(engine.file_handler.index_thread.join, 1)
+        results["load_inventory"], inventory = measure(engine.load_inventory, repeat)
+
+        # Urutan per kolom seperti klik header di show_inventory: klik pertama membangun
+        # key, klik kedua (arah sebaliknya) memakai cache, Shift+klik menambah kolom
+        sort_engine = SortEngine(inventory)
+        results["sort_first"], _ = measure(lambda: sort_engine.sorted_rows([1]), 1)
+        results["sort_reverse"], _ = measure(lambda: sort_engine.sorted_rows([1], True), 1)
+        results["sort_multi"], _ = measure(lambda: sort_engine.sorted_rows([2, 0]), 1)
+        results["sort_uncached"], _ = measure(lambda: SortEngine(inventory).sorted_rows([2]), repeat)
+
+        start_date, end_date = date(2023, 3, 1), date(2023, 3, 31)
+        # Pemanasan: panggilan pertama membuka file partisi/snapshot, tidak ikut dihitung median
+        engine.filter_transactions(start_date, end_date)
+        engine.load_transactions_view()
+        results["date_filter"], filtered = measure(lambda: engine.filter_transactions(start_date, end_date), repeat)
+        results["date_filter"]["rows"] = len(filtered)
+        results["sales_summary"], _ = measure(lambda: engine.sales_summary(start_date, end_date), repeat)
+        results["load_transactions_view"], _ = measure(engine.load_transactions_view, repeat)
+
+        # Penjualan lewat jalur sell_product_with_payment_type (stok, transaksi, rollup, snapshot)
+        _, name, price, stock, cost_price = inventory[0][:5]
+        updated = engine.update_product(tuple(str(value) for value in inventory[0]), name, price, stock + sales, cost_price)
+        product_data = tuple(str(value) for value in updated)
+        results["sell"], _ = measure(lambda: engine.sell(product_data, "tunai"), sales)
+
+        def export(export_format):
+            exporter = StreamingExporter(os.path.join(work_directory, "export." + export_format),
+                                         total=engine.file_handler.count_transactions())
+            exporter.run(engine.file_handler.iter_transactions(5000))
+            if exporter.error is not None:
+                raise exporter.error
+            return exporter.rows_written
+
+        # Tombol "Export ke Excel" menulis xlsx; format lain diukur sebagai pembanding
+        for export_format in export_formats:
+            name = "export_" + export_format
+            results[name], rows_written = measure(lambda: export(export_format), 1)
+            results[name]["rows"] = rows_written
+        engine.file_handler.close()
+        return results
+    finally:
+        SingletonFileHandler._instance = None
+        os.chdir(original_directory)
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+def compare(results, baseline):
+    # Rasio median terhadap hasil sebelumnya; > 1 berarti lebih lambat
+    baseline_sizes = {run["transaction_rows"]: run for run in baseline["runs"]}
+    for run in results["runs"]:
+        previous = baseline_sizes.get(run["transaction_rows"])
+        if previous is None:
+            continue
+        print(f"\n{run['transaction_rows']} transaksi dibanding {baseline.get('version')}:")
+        for name, value in run.items():
+            if isinstance(value, dict) and isinstance(previous.get(name), dict) and previous[name]["median"] > 0:
+                ratio = value["median"] / previous[name]["median"]
+                marker = "  <-- lebih lambat" if ratio > 1.2 else ""
+                print(f"  {name:24} {ratio:6.2f}x{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jalur utama SalesApp tanpa tampilan Tk")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000],
+                        help="Jumlah baris transaksi yang diuji (10^3 sampai 10^7)")
+    parser.add_argument("--inventory", type=int, default=None,
+                        help="Jumlah barang; bawaan sama dengan jumlah transaksi, maksimal 100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sales", type=int, default=50, help="Jumlah penjualan yang diukur")
+    parser.add_argument("--export-format", nargs="+", default=["xlsx", "csv"], choices=("csv", "xlsx", "parquet"),
+                        help="Format yang diekspor; bawaan xlsx (jalur export_to_excel) dan csv")
+    parser.add_argument("--output", default=None, help="File JSON hasil (bawaan: benchmark-<waktu>.json)")
+    parser.add_argument("--compare", default=None, help="File JSON hasil versi sebelumnya")
+    args = parser.parse_args()
+
+    results = {
+        "version": git_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": os.environ.get("SALESAPP_STORAGE", "csv"),
+        "runs": [],
+    }
+    for size in args.sizes:
+        inventory_rows = args.inventory or min(size, 100_000)
+        print(f"Benchmark {inventory_rows} barang, {size} transaksi...", flush=True)
+        run = run_size(inventory_rows, size, args.repeat, args.sales, args.export_format)
+        results["runs"].append(run)
+        for name, value in run.items():
+            if isinstance(value, dict):
+                print(f"  {name:24} {value['median'] * 1000:10.2f} ms")
+
+    output = args.output or f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nHasil disimpan ke {output}")
+    if args.compare:
+        with open(args.compare, "r") as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
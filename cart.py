@@ -0,0 +1,24 @@
+from storage import product_id
+
+
+class Cart:
+    def __init__(self):
+        self.items = {}  # ID barang (data lama: "waktu masuk|nama barang") -> [data barang, jumlah]
+
+    def add(self, product_data, quantity=1):
+        if quantity <= 0:
+            raise ValueError("Jumlah harus lebih dari 0.")
+        key = product_id(product_data) or f"{product_data[0]}|{product_data[1]}"
+        in_cart = self.items[key][1] if key in self.items else 0
+        if in_cart + quantity > int(product_data[3]):
+            raise ValueError(f"Stok {product_data[1]} tidak cukup.")
+        self.items[key] = [tuple(product_data), in_cart + quantity]
+
+    def remove(self, key):
+        self.items.pop(key, None)
+
+    def clear(self):
+        self.items.clear()
+
+    def lines(self):
+        return [(key, product_data, quantity) for key, (product_data, quantity) in self.items.items()]
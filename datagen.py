@@ -0,0 +1,100 @@
+import argparse
+import bisect
+import os
+import random
+from datetime import date, timedelta
+
+from storage import PAYMENT_TYPES
+
+PRODUCT_NAMES = ("Mie", "Beras", "Gula", "Kopi", "Teh", "Susu", "Minyak Goreng", "Sabun", "Sampo", "Pasta Gigi",
+                 "Tisu", "Handuk", "Fanta", "Sprite", "Air Mineral", "Roti", "Telur", "Kecap", "Saus", "Biskuit")
+VARIANTS = ("", "Sachet", "Botol", "Kaleng", "1 kg", "5 kg", "500 ml", "1 L", "Jumbo", "Mini")
+# Bobot jumlah transaksi per jam: toko ramai pagi dan sore, tutup tengah malam
+HOUR_WEIGHTS = (0, 0, 0, 0, 0, 0, 1, 3, 6, 8, 8, 9, 10, 9, 8, 8, 9, 10, 10, 8, 6, 3, 1, 0)
+CASH_SHARE = 0.7
+CHUNK_ROWS = 100_000
+
+
+def product_names(count):
+    names = []
+    index = 0
+    while len(names) < count:
+        base = PRODUCT_NAMES[index % len(PRODUCT_NAMES)]
+        variant = VARIANTS[(index // len(PRODUCT_NAMES)) % len(VARIANTS)]
+        series = index // (len(PRODUCT_NAMES) * len(VARIANTS))
+        name = " ".join(part for part in (base, variant) if part)
+        names.append(f"{name} {series + 1}" if series else name)
+        index += 1
+    return names
+
+
+def generate_inventory(file_path, count, start_date, days, rng):
+    # Harga kelipatan 500, modal 60-90% dari harga, stok cukup besar untuk banyak penjualan
+    products = []
+    with open(file_path, "w", newline="") as file:
+        lines = []
+        for number, name in enumerate(product_names(count)):
+            price = rng.randint(1, 200) * 500
+            cost = price * rng.randint(60, 90) // 100
+            added = start_date + timedelta(days=rng.randrange(days))
+            added_time = f"{added} {rng.randint(6, 21):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+            stock = rng.randint(10, 1000)
+            products.append((name, price, cost))
+            # ID barang seperti hasil migrasi storage.py: baris teratas mendapat ID terbesar
+            lines.append(f"{added_time},{name},{price},{stock},{cost},{count - number}\n")
+            if len(lines) >= CHUNK_ROWS:
+                file.write("".join(lines))
+                lines = []
+        file.write("".join(lines))
+    return products
+
+
+def generate_transactions(file_path, count, products, start_date, days, rng):
+    # Transaksi terurut menurut waktu seperti yang ditulis aplikasi; produk populer lebih sering
+    # terjual (distribusi mirip Zipf) dan sebagian besar pembayaran tunai
+    popularity = [1 / (rank + 1) for rank in range(len(products))]
+    cumulative = []
+    total = 0
+    for weight in popularity:
+        total += weight
+        cumulative.append(total)
+    hour_cumulative = []
+    total_hours = 0
+    for weight in HOUR_WEIGHTS:
+        total_hours += weight
+        hour_cumulative.append(total_hours)
+
+    with open(file_path, "w", newline="") as file:
+        for day_number in range(days):
+            day_rows = count // days + (1 if day_number < count % days else 0)
+            day = str(start_date + timedelta(days=day_number))
+            seconds = sorted(bisect.bisect(hour_cumulative, rng.random() * total_hours) * 3600 + rng.randrange(3600)
+                             for _ in range(day_rows))
+            lines = []
+            for second in seconds:
+                name, price, cost = products[bisect.bisect(cumulative, rng.random() * total)]
+                quantity = 1 if rng.random() < 0.7 else rng.randint(2, 5)
+                payment_type = PAYMENT_TYPES[0] if rng.random() < CASH_SHARE else PAYMENT_TYPES[1]
+                line_total = price * quantity - (5000 if payment_type == PAYMENT_TYPES[1] else 0)
+                sale_time = f"{day} {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+                lines.append(f"{sale_time},{name},{line_total},{quantity},{cost * quantity},{sale_time},{payment_type}\n")
+            file.write("".join(lines))
+
+
+def generate(directory, inventory_rows, transaction_rows, days=365, seed=0, start_date=date(2023, 1, 1)):
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    products = generate_inventory(os.path.join(directory, "inventory.csv"), inventory_rows, start_date, days, rng)
+    generate_transactions(os.path.join(directory, "transactions.csv"), transaction_rows, products, start_date, days, rng)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Membuat inventory.csv dan transactions.csv sintetis untuk pengujian")
+    parser.add_argument("directory", help="Folder tujuan (jangan gunakan folder data asli)")
+    parser.add_argument("--inventory", type=int, default=1000, help="Jumlah barang")
+    parser.add_argument("--transactions", type=int, default=100_000, help="Jumlah baris transaksi")
+    parser.add_argument("--days", type=int, default=365, help="Rentang hari transaksi, mulai 2023-01-01")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.directory, args.inventory, args.transactions, args.days, args.seed)
+    print(f"{args.inventory} barang dan {args.transactions} transaksi ditulis ke {args.directory}")
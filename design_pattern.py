@@ -1,15 +1,170 @@
+import os
+import threading
+from contextlib import contextmanager
 from tkinter import messagebox
+from storage import create_storage
+from rollup import SalesRollup, summarize
+from snapshot import TransactionSnapshot, from_rows
+from instrumentation import instrumented, metrics
+
 class SingletonFileHandler:
     _instance = None
     
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
-            cls._instance = super().__new__(cls, *args, **kwargs)
+            cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self):
+    def __init__(self, backend=None):
+        if getattr(self, "storage", None) is not None:
+            return
         self.inventory_file = "inventory.csv"
         self.transactions_file = "transactions.csv"
+        self.database_file = "sales.db"
+        self.transaction_log_dir = "transactions_log"
+        # Backend bisa dipilih lewat variabel lingkungan SALESAPP_STORAGE ("csv" atau "sqlite")
+        self.backend = backend or os.environ.get("SALESAPP_STORAGE", "csv")
+        # Tingkat fsync: SALESAPP_DURABILITY = "full" (bawaan), "normal" atau "off"
+        self.durability = os.environ.get("SALESAPP_DURABILITY", "full")
+        self.storage = create_storage(self.backend, self.inventory_file, self.transactions_file,
+                                      self.database_file, self.transaction_log_dir, self.durability)
+        self.batch_rows = None  # baris transaksi yang dikabarkan ke observer saat batch() selesai
+        # Snapshot kolom biner transactions.csv untuk pemuatan cepat (hanya backend CSV)
+        self.snapshot = TransactionSnapshot("transactions.snap", self.transactions_file) if self.backend == "csv" else None
+        # Rekap penjualan per hari/jam diperbarui lewat observer setiap ada penjualan; rollup yang
+        # belum ada dibuat oleh build_indexes di thread latar
+        self.rollup = SalesRollup("sales_rollup.db", self.storage.transactions_since)
+        self.transaction_observer = Observer()
+        self.transaction_observer.register(self.rollup)
+        # Batch yang terputus saat crash diulang dari journal, lalu rekapnya ikut diperbarui
+        recovered_rows = self.storage.recover()
+        if recovered_rows:
+            self.transaction_observer.notify(recovered_rows)
+        # Indeks riwayat transaksi dan rollup dibuat di thread latar; sampai selesai, penjualan
+        # tetap jalan, sedangkan riwayat dan rekap dibaca dari transaksinya langsung
+        self.closing = threading.Event()
+        self.index_thread = threading.Thread(target=self.build_indexes, name="index-build", daemon=True)
+        self.index_thread.start()
+
+    def build_indexes(self):
+        self.storage.prepare()
+        if self.closing.is_set():
+            return
+        if not self.rollup.is_ready():
+            self.rollup.rebuild()
+        if self.closing.is_set():
+            return
+        if self.snapshot is not None:
+            self.snapshot.sync()  # dibuat pertama kali, atau ulang setelah FORMAT_VERSION berubah
+
+    @instrumented("file.load_inventory")
+    def load_inventory(self):
+        return self.storage.load_inventory()
+
+    def iter_inventory(self, chunk_size=2000):
+        return self.storage.iter_inventory(chunk_size)
+
+    @instrumented("file.load_transactions")
+    def load_transactions(self):
+        return self.storage.load_transactions()
+
+    @instrumented("file.load_transactions_view")
+    def load_transactions_view(self):
+        # Baris transaksi untuk ditampilkan; dengan snapshot, baris dibuat hanya saat diakses.
+        # Selama snapshot masih dibuat thread latar, transactions.csv dibaca langsung.
+        loaded = self.snapshot.load(rebuild=False) if self.snapshot is not None else None
+        if loaded is not None:
+            return loaded.as_rows()
+        return self.load_transactions()
+
+    @instrumented("file.load_transaction_columns")
+    def load_transaction_columns(self):
+        loaded = self.snapshot.load(rebuild=False) if self.snapshot is not None else None
+        if loaded is not None:
+            return loaded
+        return from_rows(self.load_transactions())
+
+    @instrumented("file.load_transactions_between")
+    def load_transactions_between(self, start_date, end_date):
+        return self.storage.load_transactions_between(start_date, end_date)
+
+    def iter_transactions(self, chunk_size=5000):
+        return self.storage.iter_transactions(chunk_size)
+
+    @instrumented("file.count_transactions")
+    def count_transactions(self):
+        return self.storage.count_transactions()
+
+    @instrumented("file.add_product")
+    def add_product(self, product_data):
+        return self.storage.add_product(product_data)
+
+    @instrumented("file.update_product")
+    def update_product(self, old_data, new_data):
+        self.storage.update_product(old_data, new_data)
+
+    @instrumented("file.delete_product")
+    def delete_product(self, product_data):
+        self.storage.delete_product(product_data)
+
+    @instrumented("file.import_products")
+    def import_products(self, products):
+        return self.storage.import_products(products)
+
+    def sell_product(self, product_data, transaction_row):
+        try:
+            self.checkout([(product_data, 1)], [transaction_row])
+        except ValueError:
+            return False
+        return True
+
+    @instrumented("file.checkout")
+    def checkout(self, items, transaction_rows):
+        self.storage.checkout(items, transaction_rows)
+        rows = [[str(value) for value in row] for row in transaction_rows]
+        if self.batch_rows is not None:
+            self.batch_rows.extend(rows)
+            return
+        self.transaction_observer.notify(rows)
+        if self.snapshot is not None:
+            self.snapshot.sync(rebuild=False)
+
+    @contextmanager
+    def batch(self):
+        # Dipakai WriteBehindQueue: operasi di dalam blok disimpan sekaligus oleh storage,
+        # lalu rekap dan snapshot diperbarui sekali untuk seluruh penjualan di dalamnya
+        if self.batch_rows is not None:
+            yield
+            return
+        self.batch_rows = []
+        try:
+            with self.storage.batch():
+                yield
+            rows = self.batch_rows
+        finally:
+            self.batch_rows = None
+        if rows:
+            self.transaction_observer.notify(rows)
+            if self.snapshot is not None:
+                self.snapshot.sync(rebuild=False)
+
+    @instrumented("file.sales_summary")
+    def sales_summary(self, start_date, end_date):
+        if self.rollup.is_ready():
+            return self.rollup.summary(start_date, end_date)
+        # Rollup masih dibuat thread latar: transaksi pada rentang itu dijumlahkan langsung
+        return summarize(self.load_transactions_between(start_date, end_date))
+
+    def close(self):
+        # Pembuatan indeks yang masih berjalan tidak ditunggu: langkah berikutnya dibatalkan, dan
+        # langkah yang terputus aman (meta partisi ditulis terakhir, snapshot ditukar dengan
+        # os.replace, rollup ditulis dalam satu transaksi) lalu diulang saat start berikutnya
+        self.closing.set()
+        self.storage.close()
+        if not self.index_thread.is_alive():
+            self.rollup.close()  # bila masih berjalan, koneksinya masih dipakai thread itu
+        if metrics.dump_file:
+            metrics.dump()
 
 class Observer:
     def __init__(self):
@@ -22,24 +177,73 @@ class Observer:
         for observer in self.observers:
             result = observer.update(data)
         return result
+def validate_product(data):
+    # Mengembalikan pesan kesalahan, atau None bila data barang valid
+    product = data[1]
+    price = data[2]
+    quantity = data[3]
+
+    if not product:
+        return "Nama barang tidak boleh kosong."
+    if price <= 0:
+        return "Harga harus lebih dari 0."
+    if quantity <= 0:
+        return "Jumlah harus lebih dari 0."
+    return None
+
+def _integer_column(values, label, minimum):
+    import numpy as np
+
+    text = np.char.strip(np.asarray(values, dtype=str))
+    digits = np.char.lstrip(text, "-")
+    # Angka bulat dengan paling banyak satu tanda minus; dibatasi 15 digit agar muat di int64
+    is_number = np.char.isdigit(digits) & (np.char.str_len(text) - np.char.str_len(digits) <= 1) & (np.char.str_len(digits) <= 15)
+    numbers = np.zeros(len(text), dtype=np.int64)
+    numbers[is_number] = text[is_number].astype(np.int64)
+    checks = [(~is_number, f"{label} harus berupa angka.")]
+    if minimum > 0:
+        checks.append((numbers < minimum, f"{label} harus lebih dari 0."))
+    else:
+        checks.append((numbers < minimum, f"{label} tidak boleh negatif."))
+    return numbers, checks
+
+def validate_products(names, prices, quantities, cost_prices):
+    # Versi batch validate_product untuk impor: semua baris diperiksa sekaligus dengan NumPy.
+    # Mengembalikan nama (tanpa spasi di tepi), harga, jumlah, modal, mask baris valid, dan
+    # daftar (index, pesan) berisi kesalahan pertama tiap baris yang tidak valid.
+    import numpy as np
+
+    names = np.char.strip(np.asarray(names, dtype=str))
+    checks = [(names == "", "Nama barang tidak boleh kosong.")]
+    prices, price_checks = _integer_column(prices, "Harga", 1)
+    quantities, quantity_checks = _integer_column(quantities, "Jumlah", 1)
+    cost_prices, cost_price_checks = _integer_column(cost_prices, "Modal", 0)
+    checks += price_checks + quantity_checks + cost_price_checks
+
+    failed = np.zeros(len(names), dtype=bool)
+    errors = []
+    for mask, message in checks:
+        mask = mask & ~failed
+        errors.extend((int(index), message) for index in np.flatnonzero(mask))
+        failed |= mask
+    errors.sort()
+    return names, prices, quantities, cost_prices, ~failed, errors
+
 class InventoryObserver(Observer):
     def update(self, data):
-        product = data[1]
-        price = data[2]
-        quantity = data[3]
-        
-        if not product:
-            messagebox.showerror("Error", "Nama barang tidak boleh kosong.")
-            return False
-        if price <= 0:
-            messagebox.showerror("Error", "Harga harus lebih dari 0.")
-            return False
-        if quantity <= 0:
-            messagebox.showerror("Error", "Jumlah harus lebih dari 0.")
+        error = validate_product(data)
+        if error:
+            messagebox.showerror("Error", error)
             return False
         
         return True
 
+    def update_batch(self, data):
+        # Impor massal: data berisi baris (nama, harga, jumlah, modal); kesalahan dikumpulkan
+        # untuk laporan impor, bukan ditampilkan satu per satu dengan messagebox
+        columns = [list(column) for column in zip(*data)] if data else [[], [], [], []]
+        return validate_products(*columns)
+
 class TransactionFactory:
     @staticmethod
     def create_transaction(payment_type, transaction_data):
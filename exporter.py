@@ -0,0 +1,129 @@
+import csv
+import os
+import threading
+
+from instrumentation import metrics
+from storage import TRANSACTION_COLUMNS
+
+NUMERIC_COLUMNS = (2, 3, 4)  # Harga, Jumlah, Modal
+
+
+def chunked(rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+
+def typed_row(row):
+    # Kolom angka ditulis sebagai angka; baris lama tanpa waktu penjualan diisi kosong
+    row = list(row) + [None] * (len(TRANSACTION_COLUMNS) - len(row))
+    for index in NUMERIC_COLUMNS:
+        row[index] = int(row[index])
+    return row[:len(TRANSACTION_COLUMNS)]
+
+
+class _CsvWriter:
+    def __init__(self, file_path):
+        self.file = open(file_path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(TRANSACTION_COLUMNS)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, file_path):
+        import openpyxl  # hanya dibutuhkan untuk ekspor Excel
+
+        self.file_path = file_path
+        # Mode write-only menulis baris langsung ke file sementara, memori tetap konstan
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Transaksi")
+        self.sheet.append(TRANSACTION_COLUMNS)
+
+    def write(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.file_path)
+
+
+class _ParquetWriter:
+    def __init__(self, file_path):
+        import pyarrow as pa  # hanya dibutuhkan untuk ekspor Parquet
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        fields = [(name, pa.int64() if index in NUMERIC_COLUMNS else pa.string())
+                  for index, name in enumerate(TRANSACTION_COLUMNS)]
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(file_path, self.schema)
+
+    def write(self, rows):
+        columns = [list(column) for column in zip(*rows)]
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {".csv": _CsvWriter, ".xlsx": _XlsxWriter, ".parquet": _ParquetWriter}
+
+
+class StreamingExporter:
+    def __init__(self, file_path, total=None):
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension not in WRITERS:
+            raise ValueError(f"Format ekspor tidak didukung: {extension or file_path}")
+        self.file_path = file_path
+        self.writer_class = WRITERS[extension]
+        self.total = total
+        self.rows_written = 0
+        self.error = None
+        self.finished = threading.Event()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self, chunks):
+        # Ditulis ke file sementara dulu; file tujuan hanya diganti bila ekspor selesai
+        extension = os.path.splitext(self.file_path)[1]
+        temp_path = self.file_path + ".part" + extension
+        writer = None
+        try:
+            with metrics.timed("export" + extension.lower()) as measurement:
+                writer = self.writer_class(temp_path)
+                for chunk in chunks:
+                    if self.cancelled.is_set():
+                        break
+                    writer.write([typed_row(row) for row in chunk])
+                    self.rows_written += len(chunk)
+                writer.close()
+                writer = None
+                measurement.rows = self.rows_written
+                measurement.bytes_written = os.path.getsize(temp_path)
+            if self.cancelled.is_set():
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, self.file_path)
+        except Exception as error:
+            self.error = error
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        finally:
+            self.finished.set()
+
+    def start(self, chunks):
+        thread = threading.Thread(target=self.run, args=(chunks,), daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,110 @@
+import csv
+import os
+
+# Nama kolom yang dikenali di baris judul daftar harga (huruf kecil, tanpa spasi di tepi)
+HEADER_ALIASES = {
+    "nama": ("nama barang", "nama", "barang", "produk", "name", "product"),
+    "harga": ("harga", "harga jual", "price"),
+    "jumlah": ("jumlah", "stok", "qty", "quantity"),
+    "modal": ("modal", "harga modal", "cost"),
+}
+IMPORT_COLUMNS = ("nama", "harga", "jumlah", "modal")
+
+
+def _cell(value):
+    # Sel Excel berisi angka float (12000.0) atau None; disamakan dengan isi sel CSV
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _read_csv(file_path):
+    with open(file_path, "r", newline="", encoding="utf-8-sig") as file:
+        yield from csv.reader(file)
+
+
+def _read_xlsx(file_path):
+    from openpyxl import load_workbook  # hanya dimuat saat mengimpor file Excel
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def _column_positions(first_row):
+    # Posisi kolom dari baris judul; tanpa judul, dipakai susunan inventory.csv
+    # (waktu, nama, harga, jumlah, modal) atau nama, harga, jumlah, modal
+    header = [cell.strip().lower() for cell in first_row]
+    positions = {}
+    for column, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in header:
+                positions[column] = header.index(alias)
+                break
+    if positions:
+        missing = [column for column in IMPORT_COLUMNS[:3] if column not in positions]
+        if missing:
+            raise ValueError(f"Kolom {', '.join(missing)} tidak ditemukan di baris judul.")
+        return positions, True
+    offset = 1 if len(first_row) >= 5 else 0
+    return {column: offset + index for index, column in enumerate(IMPORT_COLUMNS)}, False
+
+
+def read_price_list(file_path):
+    # Mengembalikan (nomor_baris, [nama, harga, jumlah, modal]) untuk setiap baris yang tidak kosong.
+    # Nilai masih berupa teks; validasinya dilakukan sekaligus oleh InventoryObserver.update_batch.
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        rows = _read_xlsx(file_path)
+    elif extension in (".csv", ".txt"):
+        rows = _read_csv(file_path)
+    else:
+        raise ValueError("Format file tidak didukung. Gunakan file CSV atau XLSX.")
+
+    line_numbers = []
+    products = []
+    positions = None
+    for line_number, row in enumerate(rows, start=1):
+        if not any(cell.strip() for cell in row):
+            continue
+        if positions is None:
+            positions, has_header = _column_positions(row)
+            if has_header:
+                continue
+        width = len(row)
+        product = [row[positions[column]] if positions.get(column, width) < width else "" for column in IMPORT_COLUMNS]
+        if not product[3].strip():
+            product[3] = "0"  # Kolom modal boleh kosong atau tidak ada
+        products.append(product)
+        line_numbers.append(line_number)
+    return line_numbers, products
+
+
+class ImportReport:
+    # Hasil satu kali impor: jumlah barang baru/diperbarui dan daftar baris yang dilewati
+    def __init__(self, file_path, total_rows):
+        self.file_path = file_path
+        self.total_rows = total_rows
+        self.added = 0
+        self.updated = 0
+        self.errors = []  # (nomor_baris, nama, pesan)
+        self.warnings = []  # (nomor_baris, nama, pesan) untuk baris yang tetap diimpor
+        self.inventory = []
+
+    def summary(self):
+        return (f"{self.total_rows} baris dibaca: {self.added} barang baru, {self.updated} diperbarui, "
+                f"{len(self.errors)} dilewati, {len(self.warnings)} peringatan.")
+
+    def save(self, file_path):
+        with open(file_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Baris", "Nama Barang", "Jenis", "Keterangan"])
+            for kind, entries in (("kesalahan", self.errors), ("peringatan", self.warnings)):
+                for line_number, name, message in entries:
+                    writer.writerow([line_number, name, kind, message])
+        return file_path
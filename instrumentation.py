@@ -0,0 +1,185 @@
+import io
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+# Batas atas bucket histogram dalam detik: 50 µs, 100 µs, 200 µs, ... sampai ~100 detik
+BUCKET_BOUNDS = tuple(0.00005 * 2 ** i for i in range(22))
+
+
+class LatencyHistogram:
+    # Histogram bucket tetap: mencatat satu durasi cukup satu bisect dan beberapa penjumlahan
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        # Perkiraan: batas atas bucket tempat persentil itu jatuh, tidak melebihi nilai maksimum
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+
+class Measurement:
+    # Diisi oleh kode yang diukur (jumlah baris, byte) lalu dijumlahkan saat operasi selesai
+    def __init__(self):
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class OperationStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.errors = 0
+
+    def as_dict(self):
+        histogram = self.histogram
+        return {
+            "count": histogram.count,
+            "errors": self.errors,
+            "total_seconds": histogram.total,
+            "mean_seconds": histogram.total / histogram.count if histogram.count else 0.0,
+            "p50_seconds": histogram.percentile(0.5),
+            "p95_seconds": histogram.percentile(0.95),
+            "p99_seconds": histogram.percentile(0.99),
+            "max_seconds": histogram.max,
+            "rows": self.rows,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "buckets": {f"{bound:g}": count for bound, count in zip(BUCKET_BOUNDS + (float("inf"),), histogram.buckets) if count},
+        }
+
+
+class Metrics:
+    # Pencatat latensi per operasi untuk SalesApp, SingletonFileHandler dan penyimpanan.
+    # Bisa dimatikan dengan SALESAPP_METRICS=0; SALESAPP_METRICS_FILE menyimpan hasil saat keluar.
+    def __init__(self):
+        self.enabled = os.environ.get("SALESAPP_METRICS", "1") != "0"
+        self.dump_file = os.environ.get("SALESAPP_METRICS_FILE")
+        self.started = datetime.now()
+        self.operations = {}
+        self.profiles = {}  # operasi -> (file .prof, ringkasan teks) dari capture terakhir
+        self._profile_target = None
+        self._lock = threading.Lock()
+
+    def _stats(self, name):
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations.setdefault(name, OperationStats())
+        return stats
+
+    def record(self, name, seconds, measurement=None, error=False):
+        with self._lock:
+            stats = self._stats(name)
+            stats.histogram.record(seconds)
+            if measurement is not None:
+                stats.rows += measurement.rows
+                stats.bytes_read += measurement.bytes_read
+                stats.bytes_written += measurement.bytes_written
+            if error:
+                stats.errors += 1
+
+    @contextmanager
+    def timed(self, name):
+        measurement = Measurement()
+        if not self.enabled:
+            yield measurement
+            return
+        profiler = None
+        if self._profile_target == name:
+            with self._lock:
+                if self._profile_target == name:
+                    self._profile_target = None
+                    import cProfile  # hanya dimuat bila capture profil diminta
+                    profiler = cProfile.Profile()
+        error = False
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield measurement
+        except BaseException:
+            error = True
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self.record(name, time.perf_counter() - start, measurement, error)
+            if profiler is not None:
+                self._save_profile(name, profiler)
+
+    def instrumented(self, name):
+        # Dekorator; hasil berupa list ikut dihitung sebagai jumlah baris
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timed(name) as measurement:
+                    result = function(*args, **kwargs)
+                    if isinstance(result, list):
+                        measurement.rows += len(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def profile_next(self, name):
+        # Panggilan berikutnya dari operasi ini dijalankan di bawah cProfile
+        with self._lock:
+            self._profile_target = name
+
+    def _save_profile(self, name, profiler):
+        import pstats
+
+        safe_name = re.sub(r"[^\w.-]+", "_", name)
+        file_path = f"profile-{safe_name}-{datetime.now():%Y%m%d-%H%M%S}.prof"
+        profiler.dump_stats(file_path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(25)
+        with self._lock:
+            self.profiles[name] = (file_path, text.getvalue())
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self.operations.items())}
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+            self.started = datetime.now()
+
+    def dump(self, file_path=None):
+        file_path = file_path or self.dump_file
+        data = {"started": self.started.isoformat(timespec="seconds"),
+                "dumped": datetime.now().isoformat(timespec="seconds"),
+                "operations": self.snapshot()}
+        with open(file_path, "w") as file:
+            json.dump(data, file, indent=2)
+        return file_path
+
+
+metrics = Metrics()
+instrumented = metrics.instrumented
@@ -0,0 +1,193 @@
+from design_pattern import Observer, validate_product
+from sales_engine import now
+from storage import ID_COLUMN, price_changed_error, price_matches, product_id
+
+STOCK_COLUMN = 3
+
+
+class InventoryModel:
+    # Daftar stok di memori yang menjadi sumber data tabel. Setiap perubahan disimpan lewat
+    # SalesEngine lalu dikabarkan ke observer sebagai event kecil:
+    #   ("insert", index, baris)  ("update", index, baris, kolom)  ("remove", index, baris)
+    #   ("extend", index_awal, baris_baru)  ("reset", 0, semua_baris)
+    # Baris diubah di tempat, jadi objek baris yang sama tetap dipakai tabel yang sedang diurutkan.
+    # Dengan writer (WriteBehindQueue) perubahan langsung diterapkan di memori dan disimpan oleh
+    # thread I/O; tanpa writer disimpan dulu secara sinkron seperti sebelumnya.
+    def __init__(self, engine, writer=None):
+        self.engine = engine
+        self.writer = writer
+        self.rows = []
+        self.observer = Observer()
+        self.by_id = {}  # ID barang -> baris
+        # ID barang -> index di rows; dibangun ulang hanya setelah baris disisipkan atau dihapus,
+        # sehingga penjualan berturut-turut tetap O(1)
+        self.positions = None
+
+    def register(self, observer):
+        self.observer.register(observer)
+
+    def _notify(self, event):
+        if self.observer.observers:
+            self.observer.notify(event)
+
+    def index_of(self, row):
+        row_id = product_id(row)
+        if row_id is not None:
+            if self.positions is None:
+                self.positions = {candidate[ID_COLUMN]: index for index, candidate in enumerate(self.rows)}
+            index = self.positions.get(row_id)
+            if index is not None and self.rows[index] is row:
+                return index
+        for index, candidate in enumerate(self.rows):
+            if candidate is row:
+                return index
+        raise ValueError("Barang tidak ditemukan.")
+
+    def find(self, product_data):
+        row_id = product_id(product_data)
+        if row_id is not None:
+            return self.by_id.get(row_id)
+        for row in self.rows:
+            if row[0] == product_data[0] and row[1] == product_data[1]:
+                return row
+        return None
+
+    def _reindex(self):
+        self.by_id = {row[ID_COLUMN]: row for row in self.rows if product_id(row) is not None}
+        self.positions = None
+
+    def extend(self, rows):
+        start = len(self.rows)
+        self.rows.extend(rows)
+        for row in rows:
+            if product_id(row) is not None:
+                self.by_id[row[ID_COLUMN]] = row
+        if self.positions is not None:
+            self.positions.update((row[ID_COLUMN], start + offset) for offset, row in enumerate(rows) if product_id(row) is not None)
+        self._notify(("extend", start, rows))
+
+    def _replace_rows(self, rows):
+        self.rows[:] = rows
+        self._reindex()
+        self._notify(("reset", 0, self.rows))
+
+    def _commit(self, description, apply, operation, callback=None):
+        if self.writer is None:
+            result = operation()
+            apply()
+            if callback is not None:
+                callback(result)
+            return
+        apply()
+        self.writer.submit(description, operation, callback)
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+            self.writer.run_callbacks()
+
+    def reload(self):
+        # Setelah penyimpanan gagal: isi memori disamakan lagi dengan isi file
+        self.flush()
+        self._replace_rows(self.engine.load_inventory())
+
+    def import_products(self, file_path):
+        # Impor bisa mengubah ribuan baris sekaligus, jadi observer diberi daftar baru secara utuh
+        self.flush()
+        report = self.engine.import_products(file_path)
+        self._replace_rows(report.inventory)
+        return report
+
+    @staticmethod
+    def _saved_data(snapshot, row):
+        # Data barang saat perubahan dibuat, dengan ID terbaru dari barisnya: barang yang baru
+        # ditambahkan baru mendapat ID setelah penambahannya disimpan
+        return tuple(snapshot[:ID_COLUMN]) + (str(row[ID_COLUMN]),)
+
+    def add_product(self, product, price, quantity, cost_price):
+        # Barang baru ada di awal inventory.csv, jadi juga di awal daftar. ID-nya ("" sampai
+        # tersimpan) diisi oleh operasi simpan, lalu tabel diperbarui lewat callback.
+        current_datetime = now()
+        row = [current_datetime, product, int(price), int(quantity), int(cost_price), ""]
+        error = validate_product(row)
+        if error:
+            raise ValueError(error)
+
+        def save():
+            row[ID_COLUMN] = self.engine.add_product(product, price, quantity, cost_price, current_datetime)[ID_COLUMN]
+
+        def apply():
+            self.rows.insert(0, row)
+            self.positions = None
+            self._notify(("insert", 0, row))
+
+        def saved(_):
+            self.by_id[row[ID_COLUMN]] = row
+            try:
+                index = self.index_of(row)
+            except ValueError:
+                return  # Sudah dihapus sebelum penambahannya selesai disimpan
+            self._notify(("update", index, row, ID_COLUMN))
+
+        self._commit(f"Tambah {product}", apply, save, saved)
+        return row
+
+    def update_product(self, row, product, price, quantity, cost_price):
+        snapshot = tuple(str(value) for value in row)
+        updated = [now(), product, int(price), int(quantity), int(cost_price)]
+
+        def apply():
+            row[:ID_COLUMN] = updated
+            self._notify(("update", self.index_of(row), row, None))
+
+        self._commit(f"Perbarui {snapshot[1]}", apply,
+                     lambda: self.engine.update_product(self._saved_data(snapshot, row), *updated[1:], current_datetime=updated[0]))
+        return row
+
+    def delete_product(self, row):
+        snapshot = tuple(str(value) for value in row)
+
+        def apply():
+            index = self.index_of(row)
+            del self.rows[index]
+            self.by_id.pop(product_id(row), None)
+            self.positions = None
+            self._notify(("remove", index, row))
+
+        self._commit(f"Hapus {snapshot[1]}", apply, lambda: self.engine.delete_product(self._saved_data(snapshot, row)))
+
+    def _decrease_stock(self, row, quantity):
+        row[STOCK_COLUMN] = int(row[STOCK_COLUMN]) - quantity
+        self._notify(("update", self.index_of(row), row, STOCK_COLUMN))
+
+    def sell(self, row, payment_type, quantity=1):
+        transaction_rows, total_payment = self.checkout([(tuple(str(value) for value in row), quantity)], payment_type)
+        return transaction_rows[0], total_payment
+
+    def checkout(self, items, payment_type):
+        # Stok dicek di memori lebih dulu, karena dengan write-behind hasil simpan baru diketahui nanti.
+        # Baris transaksi (dan totalnya) dibuat sekarang supaya harga yang dipakai adalah harga saat dijual.
+        rows = []
+        for product_data, quantity in items:
+            row = self.find(product_data)
+            if row is None:
+                raise ValueError(f"Barang {product_data[1]} tidak ditemukan.")
+            if not price_matches(row, product_data):
+                raise price_changed_error(product_data)  # mis. harga diubah setelah masuk keranjang
+            if int(row[STOCK_COLUMN]) < quantity:
+                raise ValueError(f"Stok {product_data[1]} tidak cukup.")
+            rows.append(row)
+        transaction_rows, total_payment = self.engine.build_transactions(items, payment_type)
+        snapshots = [(tuple(product_data), quantity) for product_data, quantity in items]
+
+        def apply():
+            for row, (_, quantity) in zip(rows, items):
+                self._decrease_stock(row, quantity)
+
+        def save():
+            self.engine.save_checkout([(self._saved_data(product_data, row), quantity)
+                                       for row, (product_data, quantity) in zip(rows, snapshots)], transaction_rows)
+
+        names = ", ".join(product_data[1] for product_data, _ in items)
+        self._commit(f"Penjualan {names}", apply, save)
+        return transaction_rows, total_payment
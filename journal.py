@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    # Kunci eksklusif antar-proses (flock / msvcrt) sekaligus antar-thread; bisa dipakai bertingkat
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, blocking=True):
+        # blocking=False: langsung mengembalikan False bila kunci sedang dipegang proses/thread lain
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            self._file = open(self.path, "a+")
+            try:
+                locked = self._lock_file(blocking)
+            except BaseException:
+                self._file.close()
+                self._thread_lock.release()
+                raise
+            if not locked:
+                self._file.close()
+                self._file = None
+                self._thread_lock.release()
+                return False
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def _lock_file(self, blocking=True):
+        if os.name == "nt":
+            self._file.seek(0)
+            if not blocking:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                    return True
+                except OSError:
+                    return False
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    return True
+                except OSError:
+                    continue  # LK_LOCK menyerah setelah ~10 detik; coba lagi
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock_file(self):
+        if os.name == "nt":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+
+class WriteAheadJournal:
+    # Satu record JSON per batch commit, di-fsync sebelum file data diubah.
+    # Record yang masih ada saat start berarti batch itu belum selesai ditulis.
+    def __init__(self, path, sync=True):
+        self.path = path
+        self.sync = sync
+
+    def write(self, record):
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            if self.sync:
+                os.fsync(file.fileno())
+
+    def pending(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # baris terakhir terpotong: batch itu belum pernah di-commit
+        return records
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.truncate(self.path, 0)
+
+
+class CommitRequest:
+    def __init__(self, items, transaction_rows):
+        self.items = items
+        self.transaction_rows = transaction_rows
+        self.done = False
+        self.error = None
+
+
+class GroupCommitter:
+    # Permintaan commit yang datang bersamaan dikumpulkan; thread yang pertama mendapat
+    # giliran (leader) menulis semuanya dalam satu batch, yang lain cukup menunggu hasilnya
+    def __init__(self, commit_batch):
+        self.commit_batch = commit_batch
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._commit_mutex = threading.Lock()
+
+    def submit(self, items, transaction_rows):
+        request = CommitRequest(items, transaction_rows)
+        with self._pending_lock:
+            self._pending.append(request)
+        with self._commit_mutex:
+            if not request.done:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                try:
+                    self.commit_batch(batch)
+                except BaseException as error:
+                    for pending_request in batch:
+                        if pending_request.error is None:
+                            pending_request.error = error
+                    raise
+                finally:
+                    for pending_request in batch:
+                        pending_request.done = True
+        if request.error is not None:
+            raise request.error
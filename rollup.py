@@ -0,0 +1,196 @@
+import bisect
+import sqlite3
+import sys
+import threading
+
+GRANULARITIES = {"daily": 10, "hourly": 13}  # panjang prefix "YYYY-MM-DD" / "YYYY-MM-DD HH"
+
+
+def _aggregate(rows, key_length):
+    totals = {}
+    for row in rows:
+        if len(row) < 6:
+            continue
+        bucket = totals.setdefault(row[5][:key_length], [0, 0, 0, 0])
+        bucket[0] += int(row[2])
+        bucket[1] += int(row[4])
+        bucket[2] += int(row[3])
+        bucket[3] += 1
+    return totals
+
+
+def _as_summary(values):
+    sales, cost, quantity, count = values
+    return {"sales": sales, "cost": cost, "quantity": quantity, "profit": sales - cost, "count": count}
+
+
+def summarize(rows):
+    # Rekap langsung dari baris transaksi, dipakai selama rollup belum selesai dibuat
+    return _as_summary(_aggregate(rows, 0).get("", [0, 0, 0, 0]))
+
+
+class SalesRollup:
+    # source(posisi) -> (baris transaksi sesudah posisi, posisi baru), atau (None, 0) bila sumbernya
+    # menyusut. Rollup mencatat posisi terakhir yang sudah dijumlahkan (byte di transactions.csv,
+    # id di SQLite), sehingga setiap baris dihitung tepat sekali walaupun penjualan terjadi selama
+    # rollup dibuat di thread latar atau oleh proses kasir lain.
+    def __init__(self, database_file, source):
+        self.database_file = database_file
+        self.source = source
+        self.connection = sqlite3.connect(database_file, timeout=30, check_same_thread=False)
+        # Koneksi dipakai thread Tk, thread write-behind dan thread pembuat indeks
+        self.lock = threading.RLock()
+        with self.connection:
+            for table in GRANULARITIES:
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (bucket TEXT PRIMARY KEY, sales INTEGER NOT NULL, "
+                    "cost INTEGER NOT NULL, quantity INTEGER NOT NULL, count INTEGER NOT NULL)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        # Cache prefix sum per granularitas: (daftar bucket terurut, prefix kumulatif)
+        self._prefix = {}
+        self._data_version = self._current_data_version()
+
+    def _current_data_version(self):
+        # Berubah bila proses kasir lain meng-commit rollup ke database yang sama
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def _position(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'source_position'").fetchone()
+        return None if row is None else row[0]
+
+    def is_ready(self):
+        # Rollup dari versi lama belum punya posisi sumber, jadi ikut dibuat ulang
+        with self.lock:
+            return self._position() is not None
+
+    def update(self, rows):
+        # Dipanggil oleh Observer setiap ada transaksi baru. Baris yang dikabarkan tidak dijumlahkan
+        # langsung: bagian baru sumber transaksi dibaca dari posisi terakhir rollup.
+        return self.sync()
+
+    def sync(self):
+        with self.lock, self.connection:
+            # Kunci tulis lebih dulu, supaya dua proses tidak menjumlahkan bagian yang sama
+            self.connection.execute("BEGIN IMMEDIATE")
+            position = self._position()
+            if position is None:
+                return False  # Belum dibuat; rebuild() di thread latar mencakup baris ini
+            rows, new_position = self.source(position)
+            if rows is None:
+                # transactions.csv menyusut (diedit di luar aplikasi): dibuat ulang saat start berikutnya
+                self.connection.execute("DELETE FROM meta WHERE key = 'source_position'")
+                self._prefix = {}
+                return False
+            for table, key_length in GRANULARITIES.items():
+                totals = _aggregate(rows, key_length)
+                self.connection.executemany(
+                    f"INSERT INTO {table} (bucket, sales, cost, quantity, count) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(bucket) DO UPDATE SET sales = sales + excluded.sales, cost = cost + excluded.cost, "
+                    "quantity = quantity + excluded.quantity, count = count + excluded.count",
+                    [(bucket,) + tuple(values) for bucket, values in totals.items()])
+                for bucket, values in sorted(totals.items()):
+                    self._extend_prefix(table, bucket, values)
+            self._set_position(new_position)
+        return True
+
+    def _set_position(self, position):
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source_position', ?)", (position,))
+
+    def _extend_prefix(self, table, bucket, values):
+        if table not in self._prefix:
+            return
+        keys, prefix = self._prefix[table]
+        if keys and bucket == keys[-1]:
+            prefix[-1] = [a + b for a, b in zip(prefix[-1], values)]
+        elif not keys or bucket > keys[-1]:
+            keys.append(bucket)
+            prefix.append([a + b for a, b in zip(prefix[-1], values)])
+        else:
+            # Transaksi dengan waktu lebih lama dari bucket terakhir: hitung ulang saat dibutuhkan
+            del self._prefix[table]
+
+    def _load_prefix(self, table):
+        with self.lock:
+            return self._load_prefix_locked(table)
+
+    def _load_prefix_locked(self, table):
+        data_version = self._current_data_version()
+        if data_version != self._data_version:
+            self._prefix = {}
+            self._data_version = data_version
+        if table not in self._prefix:
+            keys = []
+            prefix = [[0, 0, 0, 0]]
+            cursor = self.connection.execute(f"SELECT bucket, sales, cost, quantity, count FROM {table} ORDER BY bucket")
+            for bucket, *values in cursor:
+                keys.append(bucket)
+                prefix.append([a + b for a, b in zip(prefix[-1], values)])
+            self._prefix[table] = (keys, prefix)
+        return self._prefix[table]
+
+    def _range(self, table, start_key, end_key):
+        keys, prefix = self._load_prefix(table)
+        first = bisect.bisect_left(keys, start_key)
+        last = bisect.bisect_right(keys, end_key)
+        if first >= last:
+            return _as_summary([0, 0, 0, 0])
+        return _as_summary([b - a for a, b in zip(prefix[first], prefix[last])])
+
+    def summary(self, start_date, end_date):
+        return self._range("daily", str(start_date), str(end_date))
+
+    def hourly_summary(self, start_datetime, end_datetime):
+        length = GRANULARITIES["hourly"]
+        return self._range("hourly", str(start_datetime)[:length], str(end_datetime)[:length])
+
+    def rebuild(self):
+        # Bagian lama (seluruh transaksi) dibaca dan dijumlahkan tanpa kunci; penjualan selama itu
+        # ada sesudah posisi yang dicatat, jadi ikut terhitung oleh sync berikutnya
+        rows, position = self.source(0)
+        totals = {table: _aggregate(rows, key_length) for table, key_length in GRANULARITIES.items()}
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            for table, table_totals in totals.items():
+                self.connection.execute(f"DELETE FROM {table}")
+                self.connection.executemany(
+                    f"INSERT INTO {table} (bucket, sales, cost, quantity, count) VALUES (?, ?, ?, ?, ?)",
+                    [(bucket,) + tuple(values) for bucket, values in table_totals.items()])
+            self._set_position(position)
+            self._prefix = {}
+        self.sync()
+
+    def verify(self, rows):
+        # Mengembalikan daftar (tabel, bucket, nilai di rollup, nilai dari transaksi) yang berbeda
+        mismatches = []
+        for table, key_length in GRANULARITIES.items():
+            expected = _aggregate(rows, key_length)
+            with self.lock:
+                stored = {bucket: list(values) for bucket, *values in
+                          self.connection.execute(f"SELECT bucket, sales, cost, quantity, count FROM {table}")}
+            for bucket in sorted(set(expected) | set(stored)):
+                if expected.get(bucket) != stored.get(bucket):
+                    mismatches.append((table, bucket, stored.get(bucket), expected.get(bucket)))
+        return mismatches
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+if __name__ == "__main__":
+    # python rollup.py rebuild | verify
+    from design_pattern import SingletonFileHandler
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("rebuild", "verify"):
+        print("Penggunaan: python rollup.py rebuild | verify")
+        sys.exit(1)
+    file_handler = SingletonFileHandler()
+    if sys.argv[1] == "rebuild":
+        file_handler.rollup.rebuild()
+    transactions = file_handler.load_transactions()
+    mismatches = file_handler.rollup.verify(transactions)
+    for table, bucket, stored, expected in mismatches:
+        print(f"{table} {bucket}: rollup={stored} transaksi={expected}")
+    print(f"{len(transactions)} transaksi diperiksa, {len(mismatches)} bucket berbeda.")
+    file_handler.close()
+    sys.exit(1 if mismatches else 0)
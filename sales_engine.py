@@ -0,0 +1,190 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from design_pattern import InventoryObserver, SingletonFileHandler, TransactionFactory, validate_product
+from instrumentation import metrics
+from storage import ID_COLUMN, product_key
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def now():
+    return datetime.now().strftime(DATETIME_FORMAT)
+
+
+# Logika stok dan penjualan tanpa Tk: dipakai oleh SalesApp, sales_server.py dan benchmark.
+# Kesalahan dilaporkan sebagai ValueError, bukan messagebox.
+class SalesEngine:
+    def __init__(self, file_handler=None):
+        self.file_handler = file_handler or SingletonFileHandler()
+
+    @staticmethod
+    def _typed_inventory(inventory_data):
+        for row in inventory_data:
+            row[2] = int(row[2])
+            row[3] = int(row[3])
+            row[4] = int(row[4])
+        return inventory_data
+
+    def load_inventory(self):
+        return self._typed_inventory(self.file_handler.load_inventory())
+
+    def iter_inventory(self, chunk_size=2000):
+        # Stok per potongan, untuk dimuat di thread latar sementara jendela sudah tampil
+        for chunk in self.file_handler.iter_inventory(chunk_size):
+            yield self._typed_inventory(chunk)
+
+    def load_transactions(self):
+        return self.file_handler.load_transactions()
+
+    def load_transactions_view(self):
+        return self.file_handler.load_transactions_view()
+
+    def add_product(self, product, price, quantity, cost_price, current_datetime=None):
+        product_data = (current_datetime or now(), product, int(price), int(quantity), int(cost_price))
+        error = validate_product(product_data)
+        if error:
+            raise ValueError(error)
+        return product_data + (self.file_handler.add_product(product_data),)
+
+    def update_product(self, old_data, product, price, quantity, cost_price, current_datetime=None):
+        # ID barang tidak berubah; data lama tanpa ID tetap dicari lewat isi barisnya
+        updated_product_data = (current_datetime or now(), product, int(price), int(quantity), int(cost_price)) + tuple(old_data[ID_COLUMN:ID_COLUMN + 1])
+        self.file_handler.update_product(old_data, updated_product_data)
+        return updated_product_data
+
+    def delete_product(self, product_data):
+        self.file_handler.delete_product(product_data)
+
+    def import_products(self, file_path):
+        # Impor daftar harga CSV/XLSX: semua baris divalidasi sekaligus, baris yang salah masuk
+        # laporan, lalu baris valid disimpan dalam satu kali tulis dan digabung berdasarkan nama
+        from importer import ImportReport, read_price_list
+
+        with metrics.timed("import_products") as measurement:
+            line_numbers, rows = read_price_list(file_path)
+            report = ImportReport(file_path, len(rows))
+            names, prices, quantities, cost_prices, valid, errors = InventoryObserver().update_batch(rows)
+            report.errors = [(line_numbers[index], rows[index][0], message) for index, message in errors]
+
+            # Nama yang sama lebih dari sekali di satu file: baris terakhir yang dipakai
+            current_datetime = now()
+            products = {}
+            for line_number, name, price, quantity, cost_price, is_valid in zip(
+                    line_numbers, names.tolist(), prices.tolist(), quantities.tolist(), cost_prices.tolist(), valid.tolist()):
+                if not is_valid:
+                    continue
+                key = product_key(name)
+                previous = products.pop(key, None)
+                if previous is not None:
+                    report.warnings.append((previous[0], previous[1][1], f"Diganti oleh baris {line_number} dengan nama yang sama."))
+                products[key] = (line_number, (current_datetime, name, price, quantity, cost_price))
+
+            if products:
+                report.added, report.updated, inventory = self.file_handler.import_products([product for _, product in products.values()])
+            else:
+                inventory = self.file_handler.load_inventory()
+            report.inventory = self._typed_inventory(inventory)
+            measurement.rows += len(rows)
+        return report
+
+    def sell(self, product_data, payment_type, quantity=1):
+        rows, total_payment = self.checkout([(product_data, quantity)], payment_type)
+        return rows[0], total_payment
+
+    def build_transactions(self, items, payment_type, current_datetime=None):
+        # Satu baris transaksi per barang; total tiap baris dihitung lewat TransactionFactory
+        current_datetime = current_datetime or now()
+        rows = []
+        total_payment = 0
+        for product_data, quantity in items:
+            if quantity <= 0:
+                raise ValueError("Jumlah harus lebih dari 0.")
+            transaction = TransactionFactory.create_transaction(payment_type, int(product_data[2]) * quantity)
+            line_total = transaction.calculate_total()
+            total_payment += int(line_total)
+            rows.append((current_datetime, product_data[1], line_total, quantity, int(product_data[4]) * quantity, current_datetime, payment_type))
+        return rows, total_payment
+
+    def checkout(self, items, payment_type):
+        rows, total_payment = self.build_transactions(items, payment_type)
+        self.save_checkout(items, rows)
+        return rows, total_payment
+
+    def save_checkout(self, items, transaction_rows):
+        # Menyimpan baris transaksi yang sudah dibuat build_transactions (dipakai write-behind)
+        self.file_handler.checkout(items, transaction_rows)
+
+    def sell_batch(self, requests):
+        # Beberapa penjualan (dari terminal berbeda) digabung dalam satu commit; bila ada
+        # yang gagal, penjualan diulang satu per satu supaya kegagalan tidak menular
+        current_datetime = now()
+        try:
+            prepared = [self.build_transactions([(product_data, quantity)], payment_type, current_datetime)
+                        for product_data, payment_type, quantity in requests]
+            items = [(product_data, quantity) for product_data, _, quantity in requests]
+            self.file_handler.checkout(items, [row for rows, _ in prepared for row in rows])
+            return [(rows[0], total, None) for rows, total in prepared]
+        except ValueError:
+            pass
+        results = []
+        for product_data, payment_type, quantity in requests:
+            try:
+                row, total = self.sell(product_data, payment_type, quantity)
+                results.append((row, total, None))
+            except ValueError as error:
+                results.append((None, None, str(error)))
+        return results
+
+    def filter_transactions(self, start_date, end_date):
+        return self.file_handler.load_transactions_between(start_date, end_date)
+
+    def sales_summary(self, start_date, end_date):
+        return self.file_handler.sales_summary(start_date, end_date)
+
+    def sales_report(self, start_date=None, end_date=None, top_n=10):
+        from analytics import sales_report  # NumPy hanya dimuat saat laporan diminta
+
+        return sales_report(self.file_handler.load_transaction_columns(), start_date, end_date, top_n)
+
+
+def benchmark_sales(sale_count, product_count=1000, batch_size=1):
+    # Dijalankan pada salinan data di folder sementara agar data asli tidak berubah
+    original_directory = os.getcwd()
+    work_directory = tempfile.mkdtemp(prefix="salesapp-bench-")
+    try:
+        os.chdir(work_directory)
+        with open("inventory.csv", "w") as file:
+            for i in range(product_count):
+                file.write(f"2024-01-01 00:00:00,Barang {i},5000,{sale_count},3000,{product_count - i}\n")
+        open("transactions.csv", "w").close()
+
+        engine = SalesEngine(SingletonFileHandler())
+        inventory = [tuple(str(value) for value in row) for row in engine.load_inventory()]
+        start = time.perf_counter()
+        for i in range(0, sale_count, batch_size):
+            requests = [(inventory[j % product_count], "tunai", 1) for j in range(i, min(i + batch_size, sale_count))]
+            engine.sell_batch(requests)
+        elapsed = time.perf_counter() - start
+        engine.file_handler.close()
+        return sale_count / elapsed
+    finally:
+        SingletonFileHandler._instance = None
+        os.chdir(original_directory)
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # python sales_engine.py bench [jumlah_penjualan] [jumlah_barang] [ukuran_batch]
+    if len(sys.argv) < 2 or sys.argv[1] != "bench":
+        print("Penggunaan: python sales_engine.py bench [jumlah_penjualan] [jumlah_barang] [ukuran_batch]")
+        sys.exit(1)
+    args = [int(value) for value in sys.argv[2:5]]
+    args += [1000, 1000, 1][len(args):]
+    backend = os.environ.get("SALESAPP_STORAGE", "csv")
+    throughput = benchmark_sales(*args)
+    print(f"{args[0]} penjualan, {args[1]} barang, batch {args[2]}, backend {backend}: {throughput:.0f} penjualan/detik")
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from instrumentation import metrics
+from sales_engine import SalesEngine
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 500: "Internal Server Error"}
+
+
+class SaleBatcher:
+    # Penjualan dari banyak terminal dikumpulkan sebentar lalu di-commit sekaligus
+    def __init__(self, engine, executor, max_batch=64, max_delay=0.005):
+        self.engine = engine
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue()
+
+    async def submit(self, product_data, payment_type, quantity):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(((product_data, payment_type, quantity), future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                results = await loop.run_in_executor(self.executor, self.engine.sell_batch, [request for request, _ in batch])
+            except Exception as error:
+                results = [(None, None, str(error))] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class SalesServer:
+    def __init__(self, engine=None, max_batch=64, max_delay=0.005):
+        self.engine = engine or SalesEngine()
+        # Satu thread I/O: semua akses ke penyimpanan berurutan, event loop tidak pernah terblokir
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batcher = SaleBatcher(self.engine, self.executor, max_batch, max_delay)
+
+    async def call(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def dispatch(self, method, path, query, body):
+        if method == "GET" and path == "/metrics":
+            return 200, metrics.snapshot()
+        if method == "GET" and path == "/inventory":
+            return 200, await self.call(self.engine.load_inventory)
+        if method == "GET" and path in ("/transactions", "/summary"):
+            start_date = date.fromisoformat(query["start"][0])
+            end_date = date.fromisoformat(query["end"][0])
+            if path == "/transactions":
+                return 200, await self.call(self.engine.filter_transactions, start_date, end_date)
+            return 200, await self.call(self.engine.sales_summary, start_date, end_date)
+        if method == "GET" and path == "/report":
+            start_date = date.fromisoformat(query["start"][0]) if "start" in query else None
+            end_date = date.fromisoformat(query["end"][0]) if "end" in query else None
+            top_n = int(query["top"][0]) if "top" in query else 10
+            return 200, await self.call(self.engine.sales_report, start_date, end_date, top_n)
+        if method == "POST" and path == "/products":
+            product_data = await self.call(self.engine.add_product, body["name"], body["price"], body["quantity"], body["cost_price"])
+            return 200, product_data
+        if method == "PUT" and path == "/products":
+            product_data = await self.call(self.engine.update_product, body["product"], body["name"], body["price"], body["quantity"], body["cost_price"])
+            return 200, product_data
+        if method == "DELETE" and path == "/products":
+            await self.call(self.engine.delete_product, body["product"])
+            return 200, {"deleted": True}
+        if method == "POST" and path == "/sell":
+            row, total_payment, error = await self.batcher.submit(body["product"], body.get("payment_type", "tunai"), int(body.get("quantity", 1)))
+            if error:
+                return 409, {"error": error}
+            return 200, {"transaction": row, "total_payment": total_payment}
+        if method == "POST" and path == "/checkout":
+            items = [(item["product"], int(item["quantity"])) for item in body["items"]]
+            rows, total_payment = await self.call(self.engine.checkout, items, body.get("payment_type", "tunai"))
+            return 200, {"transactions": rows, "total_payment": total_payment}
+        return 404, {"error": f"Tidak ada endpoint {method} {path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                raw_body = await reader.readexactly(length) if length else b""
+
+                url = urlsplit(target)
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                    status, payload = await self.dispatch(method, url.path, parse_qs(url.query), body)
+                except (KeyError, ValueError, TypeError) as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": str(error)}
+
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        batcher_task = asyncio.create_task(self.batcher.run())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            self.executor.shutdown(wait=True)
+            self.engine.file_handler.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Layanan penjualan lokal untuk beberapa terminal kasir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Path Unix socket (menggantikan host/port)")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay", type=float, default=0.005, help="Waktu tunggu pengumpulan batch (detik)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(SalesServer(max_batch=args.max_batch, max_delay=args.max_delay).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
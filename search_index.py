@@ -0,0 +1,188 @@
+import random
+import sys
+import time
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+
+NAME_COLUMN = 1
+MIN_FUZZY_SCORE = 0.3
+
+
+def _grams(text):
+    # Trigram dengan spasi di awal dan akhir, sehingga salah ketik di tengah kata
+    # masih menyisakan trigram yang sama di awal/akhir nama
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductSearchIndex:
+    # Indeks nama barang di memori untuk kotak pencarian:
+    # - prefiks: daftar (token, key) terurut yang dicari dengan bisect, setara trie yang
+    #   diratakan; nama lengkap dicari lebih dulu, lalu tiap kata ("goreng" -> "Minyak Goreng")
+    # - fuzzy: indeks trigram -> key untuk nama yang salah ketik ("hnaduk" -> "Handuk")
+    # Diperbarui lewat event InventoryModel (lihat inventory_model.py).
+    def __init__(self, rows=()):
+        self.rebuild(rows)
+
+    def rebuild(self, rows):
+        self.full_names = []  # (nama, key) terurut
+        self.words = []  # (kata, key) terurut
+        self.grams = {}
+        self.rows = {}  # key -> baris
+        # key berupa nomor urut, bukan id(baris): id() selalu kelipatan 16 sehingga hash-nya
+        # bertabrakan di set dan operasi irisan/gabungan menjadi jauh lebih lambat
+        self.keys = {}  # id(baris) -> key
+        self.next_key = 0
+        self.names = {}  # key -> nama terindeks (untuk menghapus token lama)
+        self.gram_counts = {}
+        self.add_rows(rows)
+
+    @staticmethod
+    def _insert_sorted(tokens, new_tokens):
+        # Banyak token sekaligus (pemuatan awal): tambahkan lalu urutkan; sedikit: insort
+        if len(new_tokens) > 64:
+            tokens.extend(new_tokens)
+            tokens.sort()
+        else:
+            for token in new_tokens:
+                insort(tokens, token)
+
+    @staticmethod
+    def _remove_sorted(tokens, token):
+        index = bisect_left(tokens, token)
+        if index < len(tokens) and tokens[index] == token:
+            del tokens[index]
+
+    def add_rows(self, rows):
+        new_names = []
+        new_words = []
+        grams_index = self.grams
+        for row in rows:
+            key = self.next_key
+            self.next_key += 1
+            self.keys[id(row)] = key
+            name = str(row[NAME_COLUMN]).lower()
+            self.rows[key] = row
+            self.names[key] = name
+            new_names.append((name, key))
+            new_words.extend((word, key) for word in set(name.split()[1:]))
+            grams = _grams(name)
+            self.gram_counts[key] = len(grams)
+            for gram in grams:
+                keys = grams_index.get(gram)
+                if keys is None:
+                    keys = grams_index[gram] = set()
+                keys.add(key)
+        self._insert_sorted(self.full_names, new_names)
+        self._insert_sorted(self.words, new_words)
+
+    def remove_row(self, row):
+        key = self.keys.pop(id(row), None)
+        if key is None:
+            return
+        name = self.names.pop(key)
+        del self.rows[key]
+        del self.gram_counts[key]
+        self._remove_sorted(self.full_names, (name, key))
+        for word in set(name.split()[1:]):
+            self._remove_sorted(self.words, (word, key))
+        for gram in _grams(name):
+            keys = self.grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.grams[gram]
+
+    def update(self, event):
+        # Observer InventoryModel: ("extend", i, baris), ("insert", i, baris),
+        # ("update", i, baris, kolom), ("remove", i, baris), ("reset", 0, semua_baris)
+        kind, _, row = event[:3]
+        if kind == "reset":
+            self.rebuild(row)
+        elif kind == "extend":
+            self.add_rows(row)
+        elif kind == "insert":
+            self.add_rows([row])
+        elif kind == "remove":
+            self.remove_row(row)
+        elif str(row[NAME_COLUMN]).lower() != self.names.get(self.keys.get(id(row))):
+            self.remove_row(row)
+            self.add_rows([row])
+
+    def search(self, query, limit=50):
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+        found = {}
+        # Nama yang diawali query lebih dulu (urut abjad), baru nama yang salah satu katanya cocok
+        for tokens in (self.full_names, self.words):
+            index = bisect_left(tokens, (query,))
+            while index < len(tokens) and len(found) < limit:
+                token, key = tokens[index]
+                if not token.startswith(query):
+                    break
+                found[key] = None
+                index += 1
+        results = list(found)
+
+        # Pencocokan fuzzy hanya bila tidak ada nama/kata yang diawali query (kemungkinan salah ketik)
+        if not results and len(query) >= 3:
+            query_grams = _grams(query)
+            query_gram_count = len(query_grams)
+            postings = [self.grams[gram] for gram in query_grams if gram in self.grams]
+            # Dice >= MIN_FUZZY_SCORE  <=>  jumlah trigram nama <= 2 * bersama / MIN - jumlah trigram query
+            max_grams = [2 * shared / MIN_FUZZY_SCORE - query_gram_count for shared in range(query_gram_count + 1)]
+            if max_grams[1] >= 2:
+                candidates = set().union(*postings)
+            else:
+                # Dengan hanya satu trigram bersama tidak ada nama (>= 2 huruf) yang lolos ambang,
+                # jadi kandidat cukup nama yang muncul di >= 2 daftar trigram. Ini dihitung dengan
+                # operasi set (di C), sehingga trigram umum seperti "an " tetap murah.
+                seen = set()
+                candidates = set()
+                for keys in postings:
+                    candidates |= keys & seen
+                    seen |= keys
+            candidates.difference_update(found)
+            shared_counts = Counter()
+            for keys in postings:
+                shared_counts.update(keys & candidates)
+            # Penyaringan dengan map/zip (sebagian besar di C); hanya yang lolos ambang yang dinilai
+            keys = list(shared_counts)
+            shared_values = list(shared_counts.values())
+            passing = [(key, shared) for key, shared, name_grams, limit_grams
+                       in zip(keys, shared_values, map(self.gram_counts.__getitem__, keys), map(max_grams.__getitem__, shared_values))
+                       if name_grams <= limit_grams]
+            scored = heapq.nsmallest(limit, ((-2 * shared / (query_gram_count + self.gram_counts[key]), len(self.names[key]),
+                                              self.names[key], key) for key, shared in passing))
+            results.extend(item[-1] for item in scored)
+        return [self.rows[key] for key in results]
+
+
+def _benchmark(product_count):
+    from datagen import product_names
+
+    rows = [["2024-01-01 00:00:00", name, 5000, 10, 3000] for name in product_names(product_count)]
+    rows.append(["2024-01-01 00:00:00", "Handuk Mandi", 25000, 5, 20000])
+    start = time.perf_counter()
+    index = ProductSearchIndex(rows)
+    print(f"Indeks {len(rows)} barang dibuat dalam {time.perf_counter() - start:.2f} detik")
+
+    rng = random.Random(0)
+    for query in ("hand", "handuk", "hnaduk", "goreng", "minyak g", "mie sachet 12", "sbun", "xyz"):
+        start = time.perf_counter()
+        results = index.search(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{query!r:18} {len(results):3} hasil {elapsed:7.2f} ms  {[row[1] for row in results[:3]]}")
+    start = time.perf_counter()
+    for row in rng.sample(rows, 100):
+        index.remove_row(row)
+        row[1] += " Baru"
+        index.add_rows([row])
+    print(f"100 perubahan nama: {(time.perf_counter() - start) * 10:.2f} ms per perubahan")
+
+
+if __name__ == "__main__":
+    # python search_index.py [jumlah_barang]
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,267 @@
+import array
+import calendar
+import csv
+import io
+import json
+import mmap
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+from journal import FileLock
+from storage import PAYMENT_TYPES
+
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Kolom angka disimpan sebagai int64 little-endian, satu file per kolom
+NUMERIC_COLUMNS = ("waktu_masuk", "nama", "harga", "jumlah", "modal", "waktu_penjualan", "pembayaran")
+MISSING = -1  # waktu kosong/tidak valid
+FORMAT_VERSION = 2  # versi 2 menambah kolom pembayaran (0 = tidak tercatat, 1 = tunai, 2 = kartu kredit)
+PAYMENT_CODES = {payment_type: code for code, payment_type in enumerate(PAYMENT_TYPES, start=1)}
+
+
+_day_epochs = {}
+_numpy = None
+
+
+def _np():
+    # NumPy baru dimuat saat kolom pertama kali dibaca, bukan saat aplikasi dibuka.
+    # Tanpa NumPy kolom dibaca sebagai memoryview, tetap tanpa salinan.
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def _epoch(value):
+    # strptime terlalu lambat untuk jutaan baris: epoch tanggal di-cache, jam dihitung langsung
+    try:
+        day = _day_epochs.get(value[:10])
+        if day is None:
+            day = _day_epochs[value[:10]] = calendar.timegm(datetime.strptime(value[:10], "%Y-%m-%d").timetuple())
+        if len(value) != 19 or value[10] != " " or value[13] != ":" or value[16] != ":":
+            raise ValueError(value)
+        return day + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+    except ValueError:
+        return MISSING
+
+
+def _format_epoch(value):
+    return time.strftime(DATETIME_FORMAT, time.gmtime(value))
+
+
+class SnapshotRows:
+    # Urutan baris transaksi "malas": baris teks hanya dibuat saat diakses (mis. oleh VirtualTable)
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return self.snapshot.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        columns = self.snapshot.columns
+        waktu_masuk = int(columns["waktu_masuk"][index])
+        row = [_format_epoch(waktu_masuk) if waktu_masuk != MISSING else "",
+               self.snapshot.names[columns["nama"][index]],
+               str(int(columns["harga"][index])), str(int(columns["jumlah"][index])), str(int(columns["modal"][index]))]
+        waktu_penjualan = int(columns["waktu_penjualan"][index])
+        payment_code = int(columns["pembayaran"][index])
+        if waktu_penjualan != MISSING or payment_code:
+            row.append(_format_epoch(waktu_penjualan) if waktu_penjualan != MISSING else "")
+        if payment_code:
+            row.append(PAYMENT_TYPES[payment_code - 1])
+        return row
+
+
+class LoadedSnapshot:
+    def __init__(self, rows, columns, names):
+        self.rows = rows
+        self.columns = columns
+        self.names = names
+
+    def as_rows(self):
+        return SnapshotRows(self)
+
+
+def _encode_rows(rows, names, name_ids):
+    # Baris CSV -> kolom int64; nama barang diganti nomor urut di tabel nama
+    columns = {column: array.array("q") for column in NUMERIC_COLUMNS}
+    new_names = []
+    for row in rows:
+        if len(row) < 5:
+            continue
+        name_id = name_ids.get(row[1])
+        if name_id is None:
+            name_id = name_ids[row[1]] = len(names)
+            names.append(row[1])
+            new_names.append(row[1])
+        columns["waktu_masuk"].append(_epoch(row[0]))
+        columns["nama"].append(name_id)
+        columns["harga"].append(int(row[2]))
+        columns["jumlah"].append(int(row[3]))
+        columns["modal"].append(int(row[4]))
+        columns["waktu_penjualan"].append(_epoch(row[5]) if len(row) > 5 else MISSING)
+        columns["pembayaran"].append(PAYMENT_CODES.get(row[6], 0) if len(row) > 6 else 0)
+    return columns, new_names
+
+
+def from_rows(rows):
+    # Untuk backend tanpa snapshot (SQLite): kolom yang sama dibangun di memori
+    names = []
+    columns, _ = _encode_rows(rows, names, {})
+    np = _np()
+    if np is not None:
+        columns = {column: np.array(values, dtype=np.int64) for column, values in columns.items()}
+    else:
+        columns = {column: memoryview(values) for column, values in columns.items()}
+    return LoadedSnapshot(len(columns["harga"]), columns, names)
+
+
+class TransactionSnapshot:
+    def __init__(self, directory, source_file):
+        self.directory = directory
+        self.source_file = source_file
+        self.meta_file = os.path.join(directory, "meta.json")
+        self.names_file = os.path.join(directory, "names.jsonl")
+        self.lock = FileLock(directory + ".lock")
+        self._names = None
+        self._name_ids = None
+
+    def _column_path(self, column, directory=None):
+        return os.path.join(directory or self.directory, column + ".i64")
+
+    def _read_meta(self):
+        if not os.path.exists(self.meta_file):
+            return None
+        with open(self.meta_file, "r") as file:
+            return json.load(file)
+
+    def _write_meta(self, meta, directory=None):
+        meta_file = os.path.join(directory or self.directory, "meta.json")
+        with open(meta_file + ".tmp", "w") as file:
+            json.dump(meta, file)
+        os.replace(meta_file + ".tmp", meta_file)
+
+    def _load_names(self, meta):
+        if self._names is None or len(self._names) != meta["names"]:
+            names = []
+            if os.path.exists(self.names_file):
+                with open(self.names_file, "r", encoding="utf-8") as file:
+                    for line in file:
+                        if len(names) == meta["names"]:
+                            break
+                        names.append(json.loads(line))
+            self._names = names
+            self._name_ids = {name: index for index, name in enumerate(names)}
+        return self._names
+
+    def _append(self, rows, meta, directory=None):
+        directory = directory or self.directory
+        columns, new_names = _encode_rows(rows, self._names, self._name_ids)
+
+        if sys.byteorder != "little":
+            for values in columns.values():
+                values.byteswap()
+        for column, values in columns.items():
+            path = self._column_path(column, directory)
+            with open(path, "ab") as file:
+                # Sisa tulisan yang tidak tercatat di meta (crash sebelumnya) dibuang dulu
+                file.truncate(meta["rows"] * 8)
+                values.tofile(file)
+        with open(os.path.join(directory, "names.jsonl"), "ab") as file:
+            file.truncate(meta["names_size"])
+            data = "".join(json.dumps(name) + "\n" for name in new_names).encode("utf-8")
+            file.write(data)
+        meta["rows"] += len(columns["harga"])
+        meta["names"] = len(self._names)
+        meta["names_size"] += len(data)
+
+    def rebuild(self):
+        with self.lock:
+            new_directory = self.directory + ".new"
+            shutil.rmtree(new_directory, ignore_errors=True)
+            os.makedirs(new_directory)
+            self._names, self._name_ids = [], {}
+            meta = {"version": FORMAT_VERSION, "rows": 0, "names": 0, "names_size": 0, "source_size": 0}
+            if os.path.exists(self.source_file):
+                with open(self.source_file, "rb") as file:
+                    data = file.read()
+                complete = data.rfind(b"\n") + 1
+                self._append(csv.reader(io.StringIO(data[:complete].decode("utf-8"))), meta, new_directory)
+                meta["source_size"] = complete
+            self._write_meta(meta, new_directory)
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.replace(new_directory, self.directory)
+
+    def sync(self, rebuild=True):
+        # Hanya bagian baru di akhir transactions.csv yang diurai; bila file CSV menyusut
+        # (diedit di luar aplikasi) atau format snapshot berubah, snapshot dibuat ulang dari awal.
+        # rebuild=False (setelah penjualan): tanpa menunggu kunci dan tanpa membuat ulang;
+        # False dikembalikan bila snapshot belum siap (dibuat oleh thread latar SingletonFileHandler).
+        if not self.lock.acquire(blocking=rebuild):
+            return False
+        try:
+            meta = self._read_meta()
+            source_size = os.path.getsize(self.source_file) if os.path.exists(self.source_file) else 0
+            if meta is None or meta.get("version") != FORMAT_VERSION or source_size < meta["source_size"]:
+                if not rebuild:
+                    return False
+                self.rebuild()
+                return True
+            if source_size == meta["source_size"]:
+                return True
+            with open(self.source_file, "rb") as file:
+                file.seek(meta["source_size"])
+                data = file.read()
+            complete = data.rfind(b"\n") + 1
+            if complete == 0:
+                return True
+            self._load_names(meta)
+            self._append(csv.reader(io.StringIO(data[:complete].decode("utf-8"))), meta)
+            meta["source_size"] += complete
+            self._write_meta(meta)
+            return True
+        finally:
+            self.lock.release()
+
+    def _map_column(self, column, rows):
+        np = _np()
+        if rows == 0:
+            return np.zeros(0, dtype="<i8") if np is not None else memoryview(array.array("q"))
+        with open(self._column_path(column), "rb") as file:
+            mapped = mmap.mmap(file.fileno(), rows * 8, access=mmap.ACCESS_READ)
+        if np is not None:
+            return np.frombuffer(mapped, dtype="<i8", count=rows)
+        return memoryview(mapped).cast("q")
+
+    def load(self, rebuild=True):
+        # rebuild=False: None bila snapshot belum siap, supaya pemanggil membaca CSV saja
+        if not self.sync(rebuild):
+            return None
+        with self.lock:
+            meta = self._read_meta()
+            names = list(self._load_names(meta))
+            columns = {column: self._map_column(column, meta["rows"]) for column in NUMERIC_COLUMNS}
+        return LoadedSnapshot(meta["rows"], columns, names)
+
+
+if __name__ == "__main__":
+    # python snapshot.py rebuild | load
+    snapshot = TransactionSnapshot("transactions.snap", "transactions.csv")
+    if len(sys.argv) >= 2 and sys.argv[1] == "rebuild":
+        snapshot.rebuild()
+    start = time.perf_counter()
+    loaded = snapshot.load()
+    print(f"{loaded.rows} transaksi dimuat dalam {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,78 @@
+import random
+import sys
+import time
+
+
+def typed_key(value):
+    # Angka dibandingkan sebagai angka, teks (nama, waktu "YYYY-MM-DD HH:MM:SS") sebagai teks
+    if isinstance(value, int):
+        return value
+    value = str(value)
+    if value.lstrip("-").isdigit():
+        return int(value)
+    return value
+
+
+class SortEngine:
+    def __init__(self, rows=None):
+        self.set_rows(rows or [])
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self._keys = {}  # kolom -> daftar key bertipe, dibuat sekali per kolom
+        self._permutations = {}  # (kolom, ..., reverse) -> urutan indeks baris
+
+    def _column_keys(self, column):
+        if column not in self._keys:
+            keys = [typed_key(row[column]) for row in self.rows]
+            # Kolom campuran angka dan teks dibandingkan sebagai teks agar tidak error
+            if len({type(key) for key in keys}) > 1:
+                keys = [str(key) for key in keys]
+            self._keys[column] = keys
+        return self._keys[column]
+
+    def permutation(self, columns, reverse=False):
+        columns = tuple(columns)
+        cache_key = columns + (reverse,)
+        if cache_key in self._permutations:
+            return self._permutations[cache_key]
+
+        keys = self._column_keys(columns[0])
+        opposite = self._permutations.get(columns + (not reverse,))
+        if len(columns) == 1 and opposite is not None:
+            # Urutan arah sebaliknya dibalik dulu sehingga Timsort hanya menemukan
+            # satu run yang sudah terurut: O(n), tanpa perbandingan ulang penuh
+            permutation = sorted(opposite[::-1], key=keys.__getitem__, reverse=reverse)
+        elif len(columns) == 1:
+            permutation = sorted(range(len(self.rows)), key=keys.__getitem__, reverse=reverse)
+        else:
+            # Multi-kolom: sort stabil berdasarkan kolom pertama di atas urutan
+            # kolom-kolom berikutnya (yang juga disimpan di cache)
+            permutation = sorted(self.permutation(columns[1:], reverse), key=keys.__getitem__, reverse=reverse)
+        self._permutations[cache_key] = permutation
+        return permutation
+
+    def sorted_rows(self, columns, reverse=False):
+        rows = self.rows
+        return [rows[index] for index in self.permutation(columns, reverse)]
+
+
+def _benchmark(row_count):
+    names = [f"Barang {i}" for i in range(1000)]
+    rows = [[f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d} 10:00:00", random.choice(names),
+             random.randint(1, 100) * 500, random.randint(0, 50), random.randint(1, 100) * 400]
+            for _ in range(row_count)]
+    engine = SortEngine(rows)
+    for label, columns, reverse in [("Jumlah naik", (3,), False), ("Jumlah naik (cache)", (3,), False),
+                                    ("Jumlah turun", (3,), True), ("Nama + Waktu", (1, 0), False),
+                                    ("Nama + Waktu turun", (1, 0), True)]:
+        start = time.perf_counter()
+        engine.sorted_rows(columns, reverse)
+        print(f"{label:<22} {time.perf_counter() - start:8.3f} detik")
+
+
+if __name__ == "__main__":
+    # python sorting.py [jumlah_baris]
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Benchmark pengurutan {row_count} baris")
+    _benchmark(row_count)
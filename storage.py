@@ -0,0 +1,745 @@
+import csv
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from transaction_log import PartitionedTransactionLog
+from journal import FileLock, GroupCommitter, WriteAheadJournal
+from instrumentation import metrics
+
+INVENTORY_COLUMNS = ("Waktu Produk Masuk", "Nama Barang", "Harga", "Jumlah", "Modal", "ID Barang")
+ID_COLUMN = 5
+TRANSACTION_COLUMNS = ("Waktu Produk Masuk", "Nama Barang", "Harga", "Jumlah", "Modal", "Waktu Penjualan", "Jenis Pembayaran")
+PAYMENT_TYPES = ("tunai", "kartu kredit")
+# full: setiap tulis di-fsync; normal: hanya journal yang di-fsync (aman bila aplikasi crash,
+# tulis terakhir bisa hilang bila listrik padam); off: tanpa fsync
+DURABILITY_LEVELS = ("full", "normal", "off")
+SQLITE_SYNCHRONOUS = {"full": "FULL", "normal": "NORMAL", "off": "OFF"}
+TRANSACTION_SELECT = ("SELECT waktu_masuk, nama_barang, harga, jumlah, modal, waktu_penjualan, jenis_pembayaran "
+                      "FROM transactions")
+
+
+def _same_product(row, product_data):
+    # Barang dicocokkan tanpa kolom jumlah, supaya stok yang sudah berubah tetap ditemukan
+    return (row[0], row[1], str(row[2]), str(row[4])) == (product_data[0], product_data[1], str(product_data[2]), str(product_data[4]))
+
+
+def price_matches(row, product_data):
+    # Harga dan modal dari data penjualan harus sama dengan yang tersimpan: terminal dengan
+    # daftar harga usang ditolak, bukan mencatat transaksi dengan nilai yang salah
+    return (str(row[2]), str(row[4])) == (str(product_data[2]), str(product_data[4]))
+
+
+def price_changed_error(product_data):
+    return ValueError(f"Harga {product_data[1]} sudah berubah, muat ulang daftar barang.")
+
+
+def product_id(product_data):
+    # ID barang, atau None untuk data lama (5 kolom) yang belum punya ID
+    if len(product_data) > ID_COLUMN and product_data[ID_COLUMN] not in (None, ""):
+        return str(product_data[ID_COLUMN])
+    return None
+
+
+def product_key(name):
+    # Impor menggabungkan barang berdasarkan nama, tanpa membedakan huruf besar/kecil dan spasi
+    return " ".join(str(name).split()).lower()
+
+
+def _atomic_write_rows(path, rows, sync=True):
+    # Tulis ke file sementara lalu ganti file lama, sehingga crash tidak memotong isi file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".csv", dir=directory)
+    try:
+        with metrics.timed("csv.rewrite " + os.path.basename(path)) as measurement, os.fdopen(fd, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerows(rows)
+            file.flush()
+            if sync:
+                os.fsync(file.fileno())
+            measurement.rows = len(rows)
+            measurement.bytes_written = file.tell()
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class InventoryIndex:
+    # Isi inventory.csv di memori dengan indeks hash ID barang -> posisi baris di file.
+    # Posisi dihitung dari akhir file: barang baru ditaruh di awal, sehingga posisi barang
+    # lain tidak bergeser dan indeks tidak perlu dibangun ulang saat barang ditambahkan.
+    def __init__(self, rows):
+        self.rows = rows
+        self.positions = {}
+        self.next_id = 1
+        for row in rows:
+            row_id = product_id(row)
+            if row_id is not None and row_id.isdigit():
+                self.next_id = max(self.next_id, int(row_id) + 1)
+        # Migrasi: baris tanpa ID (atau dengan ID ganda) diberi ID baru, dari baris terbawah
+        # (terlama) ke atas, sehingga barang teratas tetap memiliki ID terbesar
+        self.assigned = 0
+        for position, row in enumerate(reversed(rows)):
+            row_id = product_id(row)
+            if row_id is None or row_id in self.positions:
+                row_id = self.new_id()
+                row[ID_COLUMN:] = [row_id]
+                self.assigned += 1
+            self.positions[row_id] = position
+
+    def new_id(self):
+        row_id = str(self.next_id)
+        self.next_id += 1
+        return row_id
+
+    def index_of(self, row_id):
+        position = self.positions.get(str(row_id))
+        if position is None:
+            return None
+        return len(self.rows) - 1 - position
+
+    def find(self, product_data):
+        # O(1) lewat ID; data tanpa ID dicari dengan membandingkan isi baris seperti dulu
+        row_id = product_id(product_data)
+        if row_id is not None:
+            return self.index_of(row_id)
+        for index, row in enumerate(self.rows):
+            if _same_product(row, product_data):
+                return index
+        return None
+
+    def prepend(self, new_rows):
+        # ID baru diberikan dari bawah ke atas, sehingga barang teratas mendapat ID terbesar
+        count = len(self.rows) + len(new_rows)
+        for index in range(len(new_rows) - 1, -1, -1):
+            row = new_rows[index]
+            row[ID_COLUMN:] = [self.new_id()]
+            self.positions[row[ID_COLUMN]] = count - 1 - index
+        self.rows[:0] = new_rows
+
+    def remove(self, index):
+        row = self.rows.pop(index)
+        del self.positions[row[ID_COLUMN]]
+        # Hanya barang yang lebih baru (di atasnya) yang posisinya bergeser
+        for newer in self.rows[:index]:
+            self.positions[newer[ID_COLUMN]] -= 1
+        return row
+
+
+class CsvStorage:
+    def __init__(self, inventory_file, transactions_file, transaction_log_dir=None, granularity="month", durability="full"):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Tingkat durability tidak dikenal: {durability}")
+        self.inventory_file = inventory_file
+        self.durability = durability
+        self.transactions_file = transactions_file
+        self.transaction_log = None
+        if transaction_log_dir:
+            self.transaction_log = PartitionedTransactionLog(transaction_log_dir, transactions_file, granularity)
+        # Kunci file menyerialkan read-modify-write antar proses kasir; journal menjaga
+        # inventory.csv dan transactions.csv tetap konsisten bila proses mati di tengah jalan
+        self.lock = FileLock(inventory_file + ".lock")
+        self.journal = WriteAheadJournal(inventory_file + ".journal", sync=durability != "off")
+        self.committer = GroupCommitter(self._commit_batch)
+        self.index = None
+        self.index_stamp = None
+        self.pending = None  # perubahan yang ditunda selama batch()
+        self.ids_checked = False
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.inventory_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _inventory_index(self):
+        # Dipanggil dengan kunci dipegang. Indeks dipakai ulang selama inventory.csv tidak
+        # diubah proses lain; bila berubah, file dibaca dan indeks dibangun ulang.
+        stamp = self._file_stamp()
+        if self.index is None or stamp != self.index_stamp:
+            self.index = InventoryIndex(self._read_rows(self.inventory_file))
+            self.index_stamp = stamp
+            if self.index.assigned:
+                # ID baru langsung disimpan, supaya pembaca file (tabel di UI, proses kasir lain)
+                # tidak memakai ID lama yang ganda
+                self._write_inventory(self.index)
+                self.index.assigned = 0
+        return self.index
+
+    def _write_inventory(self, index):
+        if self.pending is not None:
+            self.pending["dirty"] = True  # ditulis sekali saat batch() selesai
+            return
+        try:
+            _atomic_write_rows(self.inventory_file, index.rows, self.durability == "full")
+        except BaseException:
+            self.index = None
+            raise
+        self.index_stamp = self._file_stamp()
+
+    def _ensure_ids(self):
+        # Sekali per proses, sebelum stok pertama kali dibaca (di SalesApp: di thread pemuat stok,
+        # bukan saat start): baris tanpa ID atau dengan ID ganda diberi ID baru dan langsung
+        # disimpan oleh _inventory_index
+        if not self.ids_checked:
+            with self.lock:
+                self._inventory_index()
+            self.ids_checked = True
+
+    def assign_ids(self):
+        # Migrasi inventory.csv lama: setiap barang diberi ID tetap di kolom terakhir
+        with self.lock:
+            return len(self._inventory_index().rows)
+
+    def _read_rows(self, path):
+        if not os.path.exists(path):
+            return []
+        with metrics.timed("csv.read " + os.path.basename(path)) as measurement, open(path, "r", newline="") as file:
+            rows = [row for row in csv.reader(file) if row]
+            measurement.rows = len(rows)
+            measurement.bytes_read = os.fstat(file.fileno()).st_size
+        return rows
+
+    def load_inventory(self):
+        self._ensure_ids()
+        return self._read_rows(self.inventory_file)
+
+    def load_transactions(self):
+        return self._read_rows(self.transactions_file)
+
+    def _iter_rows(self, path, chunk_size):
+        if not os.path.exists(path):
+            return
+        with open(path, "r", newline="") as file:
+            chunk = []
+            for row in csv.reader(file):
+                if row:
+                    chunk.append(row)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+            if chunk:
+                yield chunk
+
+    def iter_inventory(self, chunk_size):
+        self._ensure_ids()
+        return self._iter_rows(self.inventory_file, chunk_size)
+
+    def iter_transactions(self, chunk_size):
+        return self._iter_rows(self.transactions_file, chunk_size)
+
+    def transactions_since(self, position):
+        # Sumber SalesRollup: baris lengkap sesudah byte ke-position di transactions.csv;
+        # (None, 0) bila file lebih kecil dari posisi itu (diedit di luar aplikasi)
+        if not os.path.exists(self.transactions_file):
+            return ([], 0) if position == 0 else (None, 0)
+        with open(self.transactions_file, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < position:
+                return None, 0
+            file.seek(position)
+            data = file.read()
+        complete = data.rfind(b"\n") + 1
+        rows = [row for row in csv.reader(io.StringIO(data[:complete].decode("utf-8"))) if row]
+        return rows, position + complete
+
+    def count_transactions(self):
+        if not os.path.exists(self.transactions_file):
+            return 0
+        count = 0
+        with open(self.transactions_file, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                count += block.count(b"\n")
+        return count
+
+    def load_transactions_between(self, start_date, end_date):
+        if self.transaction_log is not None:
+            with self.lock:
+                rows = self.transaction_log.query(start_date, end_date)
+            if rows is not None:
+                return rows
+        # Tanpa partisi, atau partisi masih dibuat oleh prepare(): transactions.csv dipindai
+        start, end = str(start_date), str(end_date + timedelta(days=1))
+        return [row for row in self.load_transactions() if len(row) >= 6 and start <= row[5] < end]
+
+    def prepare(self):
+        # Dijalankan di thread latar saat start, tanpa kunci inventory: partisi riwayat dibuat
+        # pertama kali (atau dibuat ulang) di sini, bukan di tengah penjualan
+        if self.transaction_log is not None:
+            self.transaction_log.sync()
+
+    def add_product(self, product_data):
+        # Barang baru ditaruh di awal daftar, sama seperti sebelumnya; ID barunya dikembalikan
+        row = [str(value) for value in product_data[:ID_COLUMN]]
+        with self.lock:
+            index = self._inventory_index()
+            index.prepend([row])
+            self._write_inventory(index)
+        return row[ID_COLUMN]
+
+    def update_product(self, old_data, new_data):
+        with self.lock:
+            index = self._inventory_index()
+            position = index.find([str(value) for value in old_data])
+            if position is None:
+                raise ValueError("Barang tidak ditemukan.")
+            # ID barang tetap sama walaupun nama atau harganya diubah
+            index.rows[position][:ID_COLUMN] = [str(value) for value in new_data[:ID_COLUMN]]
+            self._write_inventory(index)
+
+    def delete_product(self, product_data):
+        with self.lock:
+            index = self._inventory_index()
+            position = index.find([str(value) for value in product_data])
+            if position is None:
+                raise ValueError("Barang tidak ditemukan.")
+            index.remove(position)
+            self._write_inventory(index)
+
+    def import_products(self, products):
+        # Seluruh impor = satu kali kunci dan satu kali tulis ulang inventory.csv. Barang yang
+        # namanya sudah ada diperbarui (harga, jumlah, modal); barang baru ditaruh di awal.
+        with self.lock:
+            index = self._inventory_index()
+            rows = index.rows
+            by_name = {}
+            for position, row in enumerate(rows):
+                by_name.setdefault(product_key(row[1]), position)
+            new_rows = []
+            updated = 0
+            for product in products:
+                position = by_name.get(product_key(product[1]))
+                if position is None:
+                    new_rows.append([str(value) for value in product[:ID_COLUMN]])
+                else:
+                    rows[position][2:5] = [str(value) for value in product[2:5]]
+                    updated += 1
+            index.prepend(new_rows)
+            self._write_inventory(index)
+            return len(new_rows), updated, [list(row) for row in index.rows]
+
+    def checkout(self, items, transaction_rows):
+        self.committer.submit(items, transaction_rows)
+
+    @contextmanager
+    def batch(self):
+        # Write-behind: semua operasi di dalam blok memakai indeks yang sama di bawah satu kunci.
+        # inventory.csv ditulis ulang sekali dan baris transaksi di-append sekali saat blok selesai,
+        # dengan satu record journal untuk seluruh penjualan di dalamnya.
+        with self.lock:
+            if self.pending is not None:
+                yield
+                return
+            self.pending = {"dirty": False, "sold": set(), "rows": []}
+            try:
+                yield
+            except BaseException:
+                self.index = None  # perubahan di memori belum tersimpan, jadi dibuang
+                raise
+            finally:
+                pending, self.pending = self.pending, None
+            if pending["rows"]:
+                # Stok untuk journal diambil dari indeks saat batch selesai, bukan saat dijual:
+                # barang yang diperbarui atau dihapus sesudah penjualannya di batch yang sama
+                # tidak boleh tertimpa nilai stok yang sudah usang
+                stock = {}
+                for row_id in pending["sold"]:
+                    position = self.index.index_of(row_id)
+                    if position is not None:
+                        stock[row_id] = self.index.rows[position][3]
+                self._commit_record(stock, pending["rows"])
+            elif pending["dirty"]:
+                self._write_inventory(self.index)
+
+    def _commit_batch(self, batch):
+        # Satu batch = satu kali kunci, satu record journal (satu fsync), satu tulis ulang
+        # inventory.csv dan satu append ke transactions.csv untuk semua checkout di dalamnya
+        with self.lock:
+            index = self._inventory_index()
+            rows = index.rows
+            changed = {}
+            transaction_rows = []
+            for request in batch:
+                # Stok dicek pada salinan; checkout yang gagal tidak mengubah apa pun
+                quantities = {}
+                for product_data, quantity in request.items:
+                    position = index.find(product_data)
+                    if position is not None and not price_matches(rows[position], product_data):
+                        request.error = price_changed_error(product_data)
+                        break
+                    available = None if position is None else quantities.get(position, changed.get(position, int(rows[position][3])))
+                    if available is None or available < quantity:
+                        request.error = ValueError(f"Stok {product_data[1]} tidak cukup.")
+                        break
+                    quantities[position] = available - quantity
+                if request.error is None:
+                    changed.update(quantities)
+                    transaction_rows.extend(request.transaction_rows)
+            if not transaction_rows:
+                return
+            stock = {rows[position][ID_COLUMN]: quantity for position, quantity in changed.items()}
+            if self.pending is not None:
+                # Di dalam batch(): stok langsung diubah di indeks, file ditulis saat batch selesai
+                for position, quantity in changed.items():
+                    rows[position][3] = str(quantity)
+                self.pending["sold"].update(stock)
+                self.pending["rows"].extend(transaction_rows)
+                self.pending["dirty"] = True
+                return
+            self._commit_record(stock, transaction_rows)
+
+    def _commit_record(self, stock, transaction_rows):
+        record = {
+            "stock": [[row_id, quantity] for row_id, quantity in stock.items()],
+            "transactions_size": os.path.getsize(self.transactions_file) if os.path.exists(self.transactions_file) else 0,
+            "rows": [[str(value) for value in row] for row in transaction_rows],
+        }
+        self.journal.write(record)
+        self._apply(record)
+        self.journal.clear()
+
+    def _apply(self, record):
+        # Idempoten: stok ditulis sebagai nilai akhir dan transactions.csv dipotong ke ukuran
+        # sebelum batch sebelum baris ditambahkan, jadi aman diulang saat pemulihan
+        index = self._inventory_index()
+        for row_id, quantity in record["stock"]:
+            position = index.index_of(row_id)
+            if position is not None:
+                index.rows[position][3] = str(quantity)
+        self._write_inventory(index)
+        if os.path.exists(self.transactions_file) and os.path.getsize(self.transactions_file) > record["transactions_size"]:
+            os.truncate(self.transactions_file, record["transactions_size"])
+        self.append_transactions(record["rows"])
+
+    def recover(self):
+        with self.lock:
+            records = self.journal.pending()
+            for record in records:
+                self._apply(record)
+            self.journal.clear()
+        return [row for record in records for row in record["rows"]]
+
+    def append_transactions(self, rows):
+        with metrics.timed("csv.append " + os.path.basename(self.transactions_file)) as measurement, \
+                open(self.transactions_file, "a", newline="") as file:
+            start = file.tell()
+            csv.writer(file).writerows(rows)
+            file.flush()
+            if self.durability == "full":
+                os.fsync(file.fileno())
+            measurement.rows = len(rows)
+            measurement.bytes_written = file.tell() - start
+        if self.transaction_log is not None:
+            # Hanya baris baru di akhir transactions.csv yang dimasukkan ke partisi; partisi yang
+            # belum siap dilewati dan menyusul lewat prepare()
+            self.transaction_log.sync(rebuild=False)
+
+    def close(self):
+        pass
+
+
+class SqliteStorage:
+    def __init__(self, database_file, durability="full"):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Tingkat durability tidak dikenal: {durability}")
+        self.database_file = database_file
+        self.batch_depth = 0
+        # timeout: proses kasir lain yang sedang menulis ditunggu, bukan langsung gagal
+        self.connection = sqlite3.connect(database_file, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS[durability]}")
+        self.create_tables()
+
+    def create_tables(self):
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS inventory (
+                    id INTEGER PRIMARY KEY,
+                    waktu_masuk TEXT NOT NULL,
+                    nama_barang TEXT NOT NULL,
+                    harga INTEGER NOT NULL,
+                    jumlah INTEGER NOT NULL,
+                    modal INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_inventory_produk ON inventory (waktu_masuk, nama_barang);
+                CREATE INDEX IF NOT EXISTS idx_inventory_nama ON inventory (nama_barang);
+                CREATE TABLE IF NOT EXISTS transactions (
+                    id INTEGER PRIMARY KEY,
+                    waktu_masuk TEXT NOT NULL,
+                    nama_barang TEXT NOT NULL,
+                    harga INTEGER NOT NULL,
+                    jumlah INTEGER NOT NULL,
+                    modal INTEGER NOT NULL,
+                    waktu_penjualan TEXT,
+                    jenis_pembayaran TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_transactions_waktu ON transactions (waktu_penjualan);
+            """)
+            # Database lama belum punya kolom jenis pembayaran
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(transactions)")]
+            if "jenis_pembayaran" not in columns:
+                self.connection.execute("ALTER TABLE transactions ADD COLUMN jenis_pembayaran TEXT")
+
+    def recover(self):
+        # SQLite memulihkan transaksinya sendiri lewat WAL
+        return []
+
+    def prepare(self):
+        pass  # Indeks waktu sudah ada di database
+
+    def is_empty(self):
+        inventory_count = self.connection.execute("SELECT COUNT(*) FROM inventory").fetchone()[0]
+        transaction_count = self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        return inventory_count == 0 and transaction_count == 0
+
+    def load_inventory(self):
+        # id terbesar = barang terbaru, ditampilkan paling atas seperti di CSV
+        cursor = self.connection.execute(
+            "SELECT waktu_masuk, nama_barang, harga, jumlah, modal, id FROM inventory ORDER BY id DESC")
+        return [[str(value) for value in row] for row in cursor]
+
+    def iter_inventory(self, chunk_size):
+        # Koneksi baca terpisah, karena generator ini dijalankan dari thread pemuat
+        connection = sqlite3.connect(self.database_file)
+        try:
+            cursor = connection.execute(
+                "SELECT waktu_masuk, nama_barang, harga, jumlah, modal, id FROM inventory ORDER BY id DESC")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [[str(value) for value in row] for row in rows]
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _transaction_row(row):
+        # Kolom opsional di akhir yang kosong dibuang, sama seperti baris lama di CSV
+        values = [str(value) for value in row[:5]]
+        optional = list(row[5:])
+        while optional and optional[-1] is None:
+            optional.pop()
+        return values + ["" if value is None else value for value in optional]
+
+    def load_transactions(self):
+        cursor = self.connection.execute(TRANSACTION_SELECT + " ORDER BY id")
+        return [self._transaction_row(row) for row in cursor]
+
+    def iter_transactions(self, chunk_size):
+        # Koneksi baca terpisah, karena generator ini bisa dijalankan dari thread lain
+        connection = sqlite3.connect(self.database_file)
+        try:
+            cursor = connection.execute(TRANSACTION_SELECT + " ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [self._transaction_row(row) for row in rows]
+        finally:
+            connection.close()
+
+    def transactions_since(self, position):
+        # Sumber SalesRollup: transaksi dengan id lebih besar dari position. Koneksi baca terpisah,
+        # karena dipanggil juga dari thread pembuat indeks.
+        connection = sqlite3.connect(self.database_file, timeout=30)
+        try:
+            cursor = connection.execute(
+                "SELECT waktu_masuk, nama_barang, harga, jumlah, modal, waktu_penjualan, jenis_pembayaran, id "
+                "FROM transactions WHERE id > ? ORDER BY id", (position,))
+            rows = []
+            for row in cursor:
+                rows.append(self._transaction_row(row[:7]))
+                position = row[7]
+            return rows, position
+        finally:
+            connection.close()
+
+    def count_transactions(self):
+        return self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def load_transactions_between(self, start_date, end_date):
+        cursor = self.connection.execute(
+            TRANSACTION_SELECT + " WHERE waktu_penjualan >= ? AND waktu_penjualan < ? ORDER BY waktu_penjualan, id",
+            (str(start_date), str(end_date + timedelta(days=1))))
+        return [self._transaction_row(row) for row in cursor]
+
+    @contextmanager
+    def batch(self):
+        # Write-behind: semua operasi di dalam blok menjadi satu transaksi database (satu commit)
+        if self.batch_depth:
+            yield
+            return
+        self.connection.execute("BEGIN IMMEDIATE")
+        self.batch_depth = 1
+        try:
+            yield
+        except BaseException:
+            self.connection.rollback()
+            raise
+        else:
+            self.connection.commit()
+        finally:
+            self.batch_depth = 0
+
+    @contextmanager
+    def _transaction(self):
+        # Di luar batch(): satu transaksi per operasi. Di dalam batch(): SAVEPOINT, sehingga
+        # operasi yang gagal dibatalkan sendiri tanpa membatalkan operasi lain di batch itu.
+        if not self.batch_depth:
+            with self.connection:
+                yield
+            return
+        self.connection.execute("SAVEPOINT operasi")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK TO operasi")
+            raise
+        finally:
+            self.connection.execute("RELEASE operasi")
+
+    def add_product(self, product_data):
+        # Kolom id (INTEGER PRIMARY KEY) menjadi ID barang
+        with self._transaction():
+            cursor = self.connection.execute(
+                "INSERT INTO inventory (waktu_masuk, nama_barang, harga, jumlah, modal) VALUES (?, ?, ?, ?, ?)",
+                tuple(product_data[:5]))
+        return str(cursor.lastrowid)
+
+    def _product_filter(self, product_data):
+        # Lewat primary key bila data punya ID; data lama dicocokkan dengan isi barisnya
+        row_id = product_id(product_data)
+        if row_id is not None:
+            return "id = ?", (int(row_id),)
+        return "waktu_masuk = ? AND nama_barang = ? AND harga = ? AND modal = ?", \
+            (product_data[0], product_data[1], product_data[2], product_data[4])
+
+    def import_products(self, products):
+        with self.connection:
+            by_name = {}
+            for row_id, name in self.connection.execute("SELECT id, nama_barang FROM inventory ORDER BY id DESC"):
+                by_name.setdefault(product_key(name), row_id)
+            inserts = []
+            updates = []
+            for product in products:
+                row_id = by_name.get(product_key(product[1]))
+                if row_id is None:
+                    inserts.append(tuple(product[:5]))
+                else:
+                    updates.append((product[2], product[3], product[4], row_id))
+            self.connection.executemany("UPDATE inventory SET harga = ?, jumlah = ?, modal = ? WHERE id = ?", updates)
+            # Dimasukkan terbalik agar urutan id DESC sama dengan urutan di file impor
+            self.connection.executemany(
+                "INSERT INTO inventory (waktu_masuk, nama_barang, harga, jumlah, modal) VALUES (?, ?, ?, ?, ?)",
+                inserts[::-1])
+        return len(inserts), len(updates), self.load_inventory()
+
+    def update_product(self, old_data, new_data):
+        condition, parameters = self._product_filter(old_data)
+        with self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE inventory SET waktu_masuk = ?, nama_barang = ?, harga = ?, jumlah = ?, modal = ? "
+                "WHERE id = (SELECT id FROM inventory WHERE " + condition + " LIMIT 1)",
+                tuple(new_data[:5]) + parameters)
+            if cursor.rowcount == 0:
+                raise ValueError("Barang tidak ditemukan.")
+
+    def delete_product(self, product_data):
+        condition, parameters = self._product_filter(product_data)
+        with self._transaction():
+            cursor = self.connection.execute(
+                "DELETE FROM inventory WHERE id = (SELECT id FROM inventory WHERE " + condition + " LIMIT 1)", parameters)
+            if cursor.rowcount == 0:
+                raise ValueError("Barang tidak ditemukan.")
+
+    def checkout(self, items, transaction_rows):
+        # Pengurangan stok dan pencatatan transaksi dalam satu transaksi database;
+        # ValueError di tengah jalan membatalkan (rollback) seluruh checkout
+        with self._transaction():
+            for product_data, quantity in items:
+                condition, parameters = self._product_filter(product_data)
+                # Harga dan modal ikut dicek di UPDATE yang sama, jadi tetap satu langkah atomik
+                cursor = self.connection.execute(
+                    "UPDATE inventory SET jumlah = jumlah - ? WHERE id = ("
+                    "SELECT id FROM inventory WHERE " + condition + " AND jumlah >= ? AND harga = ? AND modal = ? LIMIT 1)",
+                    (quantity,) + parameters + (quantity, int(product_data[2]), int(product_data[4])))
+                if cursor.rowcount == 0:
+                    stored = self.connection.execute(
+                        "SELECT harga, jumlah, modal FROM inventory WHERE " + condition + " LIMIT 1", parameters).fetchone()
+                    if stored is not None and not price_matches((None, None) + tuple(stored), product_data):
+                        raise price_changed_error(product_data)
+                    raise ValueError(f"Stok {product_data[1]} tidak cukup.")
+            self._insert_transactions(transaction_rows)
+
+    def append_transactions(self, rows):
+        with self._transaction():
+            self._insert_transactions(rows)
+
+    def _insert_transactions(self, rows):
+        self.connection.executemany(
+            "INSERT INTO transactions (waktu_masuk, nama_barang, harga, jumlah, modal, waktu_penjualan, jenis_pembayaran) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [tuple(row[:5]) + tuple(row[index] if len(row) > index else None for index in (5, 6)) for row in rows])
+
+    def close(self):
+        self.connection.close()
+
+
+def migrate_csv_to_sqlite(inventory_file, transactions_file, database_file):
+    csv_storage = CsvStorage(inventory_file, transactions_file)
+    sqlite_storage = SqliteStorage(database_file)
+    try:
+        inventory = csv_storage.load_inventory()
+        with sqlite_storage.connection:
+            # Kunci tulis diambil sebelum memeriksa isi database, supaya proses kasir lain yang
+            # bermigrasi bersamaan menunggu lalu melihat database sudah terisi
+            sqlite_storage.connection.execute("BEGIN IMMEDIATE")
+            if not sqlite_storage.is_empty():
+                raise RuntimeError(f"Database {database_file} sudah berisi data, migrasi dibatalkan.")
+            # ID barang dari CSV dipakai sebagai id; urutan dibalik agar barang teratas di CSV
+            # tetap yang terakhir dimasukkan
+            sqlite_storage.connection.executemany(
+                "INSERT INTO inventory (waktu_masuk, nama_barang, harga, jumlah, modal, id) VALUES (?, ?, ?, ?, ?, ?)",
+                [tuple(row[:5]) + (int(row[ID_COLUMN]),) for row in reversed(inventory)])
+            sqlite_storage._insert_transactions(csv_storage.load_transactions())
+        return sqlite_storage
+    except BaseException:
+        sqlite_storage.close()
+        raise
+
+
+def create_storage(backend, inventory_file, transactions_file, database_file, transaction_log_dir=None, durability="full"):
+    if backend == "csv":
+        return CsvStorage(inventory_file, transactions_file, transaction_log_dir, durability=durability)
+    if backend == "sqlite":
+        if not os.path.exists(database_file):
+            try:
+                migrate_csv_to_sqlite(inventory_file, transactions_file, database_file).close()
+            except RuntimeError:
+                pass  # Sudah dimigrasi oleh proses lain
+        return SqliteStorage(database_file, durability)
+    raise ValueError(f"Backend penyimpanan tidak dikenal: {backend}")
+
+
+if __name__ == "__main__":
+    # python storage.py migrate [inventory.csv] [transactions.csv] [sales.db]
+    # python storage.py assign-ids [inventory.csv]
+    if len(sys.argv) >= 2 and sys.argv[1] == "assign-ids":
+        inventory_file = sys.argv[2] if len(sys.argv) > 2 else "inventory.csv"
+        storage = CsvStorage(inventory_file, "transactions.csv")
+        print(f"{storage.assign_ids()} barang di {inventory_file} sudah memiliki ID")
+        sys.exit(0)
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Penggunaan: python storage.py migrate [inventory.csv] [transactions.csv] [sales.db]")
+        print("            python storage.py assign-ids [inventory.csv]")
+        sys.exit(1)
+    args = sys.argv[2:5]
+    args += ["inventory.csv", "transactions.csv", "sales.db"][len(args):]
+    migrate_csv_to_sqlite(*args).close()
+    print(f"Migrasi selesai: {args[2]}")
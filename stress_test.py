@@ -0,0 +1,136 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+def _seller(work_directory, attempts, start_event, results):
+    os.chdir(work_directory)
+    from sales_engine import SalesEngine
+
+    engine = SalesEngine()
+    product_data = tuple(str(value) for value in engine.load_inventory()[0])
+    sold = 0
+    start_event.wait()
+    for _ in range(attempts):
+        try:
+            engine.sell(product_data, "tunai")
+            sold += 1
+        except ValueError:
+            pass
+    engine.file_handler.close()
+    results.put(sold)
+
+
+def run(processes, attempts, stock, backend):
+    # N proses menjual barang yang sama bersamaan; stok akhir harus tepat stok awal dikurangi
+    # jumlah penjualan yang berhasil, tanpa pengurangan yang hilang dan tanpa stok negatif
+    work_directory = tempfile.mkdtemp(prefix="salesapp-stress-")
+    os.environ["SALESAPP_STORAGE"] = backend
+    try:
+        with open(os.path.join(work_directory, "inventory.csv"), "w") as file:
+            file.write(f"2024-01-01 00:00:00,Barang Uji,5000,{stock},3000\n")
+        open(os.path.join(work_directory, "transactions.csv"), "w").close()
+
+        context = multiprocessing.get_context("spawn")
+        start_event = context.Event()
+        results = context.Queue()
+        workers = [context.Process(target=_seller, args=(work_directory, attempts, start_event, results))
+                   for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        time.sleep(1)  # menunggu semua proses siap
+        start = time.perf_counter()
+        start_event.set()
+        sold = sum(results.get() for _ in workers)
+        elapsed = time.perf_counter() - start
+        for worker in workers:
+            worker.join()
+
+        os.chdir(work_directory)
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from sales_engine import SalesEngine
+
+        engine = SalesEngine()
+        final_stock = engine.load_inventory()[0][3]
+        transaction_count = len(engine.load_transactions())
+        engine.file_handler.close()
+
+        print(f"Backend {backend}: {processes} proses x {attempts} percobaan, stok awal {stock}")
+        print(f"Terjual {sold}, stok akhir {final_stock}, baris transaksi {transaction_count}")
+        print(f"Throughput: {sold / elapsed:.0f} penjualan/detik ({elapsed:.2f} detik)")
+        ok = final_stock == stock - sold and transaction_count == sold and final_stock >= 0
+        print("OK: tidak ada pengurangan stok yang hilang" if ok else "GAGAL: stok dan transaksi tidak cocok")
+        return ok
+    finally:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+def check_write_behind(backend):
+    # Operasi yang tersimpan dalam satu flush write-behind: isi file harus sama dengan isi memori
+    # setelah jual lalu ubah, jual lalu hapus, dan tambah lalu jual barang yang sama
+    work_directory = tempfile.mkdtemp(prefix="salesapp-write-behind-")
+    os.environ["SALESAPP_STORAGE"] = backend
+    try:
+        with open(os.path.join(work_directory, "inventory.csv"), "w") as file:
+            file.write("2024-01-01 00:00:00,Barang A,5000,23,3000,2\n")
+            file.write("2024-01-01 00:00:00,Barang B,7000,10,4000,1\n")
+        open(os.path.join(work_directory, "transactions.csv"), "w").close()
+        os.chdir(work_directory)
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from sales_engine import SalesEngine
+        from inventory_model import InventoryModel
+        from write_behind import WriteBehindQueue
+
+        engine = SalesEngine()
+        # Jeda panjang: semua operasi di bawah ini masuk ke satu flush
+        writer = WriteBehindQueue(engine.file_handler, flush_interval=60)
+        model = InventoryModel(engine, writer)
+        model.extend(engine.load_inventory())
+        barang_a, barang_b = model.rows
+        model.sell(barang_a, "tunai")
+        model.update_product(barang_a, "Barang A", 5000, 100, 3000)
+        model.sell(barang_b, "tunai")
+        model.delete_product(barang_b)
+        barang_c = model.add_product("Barang C", 9000, 5, 6000)
+        model.sell(barang_c, "kartu kredit", 2)
+        model.flush()
+        writer.close()
+
+        failures = writer.take_failures()
+        saved = [[str(value) for value in row] for row in engine.load_inventory()]
+        in_memory = [[str(value) for value in row] for row in model.rows]
+        transaction_count = len(engine.load_transactions())
+        engine.file_handler.close()
+
+        print(f"Backend {backend}: {writer.flush_count} flush, {transaction_count} baris transaksi")
+        for description, error in failures:
+            print(f"Gagal disimpan: {description}: {error}")
+        ok = not failures and saved == in_memory and transaction_count == 3 \
+            and [row[1:4] for row in saved] == [["Barang C", "9000", "3"], ["Barang A", "5000", "100"]]
+        if not ok:
+            print(f"Di file:   {saved}")
+            print(f"Di memori: {in_memory}")
+        print("OK: isi file sama dengan isi memori" if ok else "GAGAL: isi file berbeda dengan isi memori")
+        return ok
+    finally:
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji beban penjualan bersamaan dari beberapa proses kasir")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--attempts", type=int, default=100)
+    parser.add_argument("--stock", type=int, default=300, help="Stok awal (lebih kecil dari total percobaan agar stok habis)")
+    parser.add_argument("--backend", default="csv", choices=("csv", "sqlite"))
+    parser.add_argument("--write-behind", action="store_true",
+                        help="Periksa jual/ubah/hapus/tambah dalam satu flush write-behind, bukan uji beban")
+    args = parser.parse_args()
+    if args.write_behind:
+        sys.exit(0 if check_write_behind(args.backend) else 1)
+    sys.exit(0 if run(args.processes, args.attempts, args.stock, args.backend) else 1)
@@ -0,0 +1,248 @@
+import array
+import bisect
+import calendar
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+from datetime import date, datetime, timedelta
+
+from journal import FileLock
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_epoch(value):
+    # Waktu disimpan tanpa zona waktu, jadi cukup diperlakukan sebagai UTC
+    if isinstance(value, str):
+        value = datetime.strptime(value, DATETIME_FORMAT)
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return calendar.timegm(value.timetuple())
+
+
+def _encode_row(row):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _decode_rows(data):
+    return [row for row in csv.reader(io.StringIO(data.decode("utf-8"))) if row]
+
+
+class PartitionedTransactionLog:
+    def __init__(self, directory, source_file=None, granularity="month"):
+        if granularity not in ("day", "month"):
+            raise ValueError("Granularity harus 'day' atau 'month'.")
+        self.directory = directory
+        self.source_file = source_file
+        self.granularity = granularity
+        self.meta_file = os.path.join(directory, "meta.json")
+        # Semua baca/tulis partisi di bawah kunci ini, terpisah dari kunci inventory, supaya
+        # pembuatan partisi yang lama tidak menahan penjualan
+        self.lock = FileLock(directory + ".lock")
+
+    def partition_key(self, value):
+        if self.granularity == "day":
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m")
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".csv", base + ".csv.gz", base + ".idx", base + ".unsorted"
+
+    def _partition_keys(self):
+        if not os.path.isdir(self.directory):
+            return []
+        keys = set()
+        for name in os.listdir(self.directory):
+            if name.endswith(".idx"):
+                keys.add(name[:-len(".idx")])
+        return sorted(keys)
+
+    def _read_meta(self):
+        if not os.path.exists(self.meta_file):
+            return None
+        with open(self.meta_file, "r") as file:
+            return json.load(file)
+
+    def _write_meta(self, meta):
+        temp_path = self.meta_file + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(meta, file)
+        os.replace(temp_path, self.meta_file)
+
+    def _write_rows(self, rows):
+        # Baris dikelompokkan per partisi supaya tiap file dibuka sekali saja
+        grouped = {}
+        for row in rows:
+            if len(row) < 6:
+                continue
+            sale_time = datetime.strptime(row[5], DATETIME_FORMAT)
+            grouped.setdefault(self.partition_key(sale_time), []).append((to_epoch(sale_time), row))
+
+        for key, entries in grouped.items():
+            csv_path, gz_path, idx_path, unsorted_path = self._paths(key)
+            if os.path.exists(gz_path):
+                self._decompress(key)
+            offset = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+            index = array.array("q")
+            if os.path.exists(idx_path) and os.path.getsize(idx_path) >= 16:
+                with open(idx_path, "rb") as file:
+                    file.seek(-16, os.SEEK_END)
+                    index.frombytes(file.read(16))
+            last_epoch = index[0] if index else None
+
+            new_index = array.array("q")
+            chunks = []
+            unsorted = False
+            for epoch, row in entries:
+                data = _encode_row(row)
+                if last_epoch is not None and epoch < last_epoch:
+                    unsorted = True
+                last_epoch = epoch
+                new_index.extend((epoch, offset))
+                chunks.append(data)
+                offset += len(data)
+
+            with open(csv_path, "ab") as file:
+                file.write(b"".join(chunks))
+            with open(idx_path, "ab") as file:
+                new_index.tofile(file)
+            if unsorted:
+                # Urutan waktu rusak (mis. jam komputer mundur), partisi ini dipindai penuh saat query
+                open(unsorted_path, "w").close()
+
+    def rebuild(self):
+        with self.lock:
+            if os.path.isdir(self.directory):
+                shutil.rmtree(self.directory)
+            os.makedirs(self.directory)
+            source_size = 0
+            if self.source_file and os.path.exists(self.source_file):
+                with open(self.source_file, "rb") as file:
+                    data = file.read()
+                # Baris terakhir yang belum selesai ditulis penjualan lain diambil oleh sync berikutnya
+                source_size = data.rfind(b"\n") + 1
+                self._write_rows(_decode_rows(data[:source_size]))
+            self._write_meta({"source_size": source_size})
+
+    def sync(self, rebuild=True):
+        # Menyesuaikan partisi dengan transactions.csv bila file itu berubah di luar log ini.
+        # rebuild=False (jalur penjualan dan query): hanya baris baru di akhir yang ditambahkan,
+        # tanpa menunggu kunci. Mengembalikan False bila partisi belum siap (belum dibuat, perlu
+        # dibuat ulang, atau sedang dibuat oleh thread/proses lain).
+        if not self.lock.acquire(blocking=rebuild):
+            return False
+        try:
+            if not self.source_file:
+                os.makedirs(self.directory, exist_ok=True)
+                return True
+            meta = self._read_meta()
+            source_size = os.path.getsize(self.source_file) if os.path.exists(self.source_file) else 0
+            if meta is None or source_size < meta["source_size"]:
+                if not rebuild:
+                    return False
+                self.rebuild()
+                return True
+            if source_size == meta["source_size"]:
+                return True
+            with open(self.source_file, "rb") as file:
+                file.seek(meta["source_size"])
+                data = file.read()
+            complete = data.rfind(b"\n") + 1
+            if complete == 0:
+                return True
+            self._write_rows(_decode_rows(data[:complete]))
+            self._write_meta({"source_size": meta["source_size"] + complete})
+            return True
+        finally:
+            self.lock.release()
+
+    def _read_partition(self, key, start_epoch, end_epoch):
+        csv_path, gz_path, idx_path, unsorted_path = self._paths(key)
+        index = array.array("q")
+        with open(idx_path, "rb") as file:
+            index.frombytes(file.read())
+        epochs = index[0::2]
+        offsets = index[1::2]
+        if not epochs:
+            return []
+
+        opener = (lambda: gzip.open(gz_path, "rb")) if os.path.exists(gz_path) else (lambda: open(csv_path, "rb"))
+        if os.path.exists(unsorted_path):
+            with opener() as file:
+                rows = _decode_rows(file.read())
+            return [row for row, epoch in zip(rows, epochs) if start_epoch <= epoch < end_epoch]
+
+        first = bisect.bisect_left(epochs, start_epoch)
+        last = bisect.bisect_left(epochs, end_epoch)
+        if first >= last:
+            return []
+        with opener() as file:
+            file.seek(offsets[first])
+            if last < len(offsets):
+                data = file.read(offsets[last] - offsets[first])
+            else:
+                data = file.read()
+        return _decode_rows(data)
+
+    def query(self, start_date, end_date):
+        # None bila partisi belum siap; pemanggil lalu memindai transactions.csv
+        if not self.lock.acquire(blocking=False):
+            return None
+        try:
+            if not self.sync(rebuild=False):
+                return None
+            return self._query(start_date, end_date)
+        finally:
+            self.lock.release()
+
+    def _query(self, start_date, end_date):
+        start_key = self.partition_key(start_date)
+        end_key = self.partition_key(end_date)
+        start_epoch = to_epoch(start_date)
+        end_epoch = to_epoch(end_date + timedelta(days=1))
+        rows = []
+        for key in self._partition_keys():
+            if start_key <= key <= end_key:
+                rows.extend(self._read_partition(key, start_epoch, end_epoch))
+        return rows
+
+    def _decompress(self, key):
+        csv_path, gz_path, _, _ = self._paths(key)
+        with gzip.open(gz_path, "rb") as source, open(csv_path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(gz_path)
+
+    def compress_older_than(self, days):
+        # Partisi lama dikompres gzip; offset di .idx tetap menunjuk ke data yang belum dikompres
+        with self.lock:
+            self.sync()
+            cutoff_key = self.partition_key(date.today() - timedelta(days=days))
+            compressed = []
+            for key in self._partition_keys():
+                csv_path, gz_path, _, _ = self._paths(key)
+                if key < cutoff_key and os.path.exists(csv_path):
+                    with open(csv_path, "rb") as source, gzip.open(gz_path, "wb") as target:
+                        shutil.copyfileobj(source, target)
+                    os.remove(csv_path)
+                    compressed.append(key)
+            return compressed
+
+
+if __name__ == "__main__":
+    # python transaction_log.py rebuild | compress <hari>
+    log = PartitionedTransactionLog("transactions_log", "transactions.csv")
+    if len(sys.argv) >= 2 and sys.argv[1] == "rebuild":
+        log.rebuild()
+        print(f"Partisi dibuat ulang: {', '.join(log._partition_keys())}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "compress":
+        print(f"Partisi dikompres: {', '.join(log.compress_older_than(int(sys.argv[2])))}")
+    else:
+        print("Penggunaan: python transaction_log.py rebuild | compress <hari>")
+        sys.exit(1)
@@ -0,0 +1,196 @@
+import tkinter as tk
+import tkinter.ttk as ttk
+
+from instrumentation import instrumented
+
+
+# Treeview yang hanya menyimpan baris yang terlihat sebagai item. Data lengkap ada di
+# self.rows; item Treeview dipakai ulang sebagai "slot" dan isinya diganti saat tabel
+# digulir, sehingga waktu buka jendela dan memori tidak bergantung pada jumlah data.
+class VirtualTable(tk.Frame):
+    def __init__(self, master, columns, visible_rows=20, buffer_rows=2, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columns = columns
+        self.rows = []
+        self.display = None  # fungsi opsional: baris data -> nilai yang ditampilkan
+        self.offset = 0
+        self.selected_index = None
+        self.loading = False  # True selama baris masih dimuat di latar
+        self.buffer_rows = buffer_rows
+        self.slots = []
+
+        table_frame = tk.Frame(self)
+        table_frame.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(table_frame, columns=columns, height=visible_rows, selectmode="browse")
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        # Kontrol halaman dan jumlah baris
+        paging_frame = tk.Frame(self)
+        paging_frame.pack(fill="x", pady=(5, 0))
+        ttk.Button(paging_frame, text="<<", width=3, command=lambda: self.scroll_to(0)).pack(side="left")
+        ttk.Button(paging_frame, text="<", width=3, command=lambda: self.scroll_pages(-1)).pack(side="left", padx=2)
+        ttk.Button(paging_frame, text=">", width=3, command=lambda: self.scroll_pages(1)).pack(side="left", padx=2)
+        ttk.Button(paging_frame, text=">>", width=3, command=lambda: self.scroll_to(len(self.rows))).pack(side="left")
+        self.status_label = tk.Label(paging_frame, anchor="e")
+        self.status_label.pack(side="right")
+
+        self._set_slot_count(visible_rows)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda event: self._scroll_units(-1 if event.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda event: self._scroll_units(-1) or "break")
+        self.tree.bind("<Button-5>", lambda event: self._scroll_units(1) or "break")
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1) or "break")
+        self.tree.bind("<Down>", lambda event: self._move_selection(1) or "break")
+        self.tree.bind("<Prior>", lambda event: self.scroll_pages(-1) or "break")
+        self.tree.bind("<Next>", lambda event: self.scroll_pages(1) or "break")
+
+    @property
+    def page_size(self):
+        return max(1, len(self.slots) - self.buffer_rows)
+
+    def heading(self, column, **kwargs):
+        self.tree.heading(column, **kwargs)
+
+    def _set_slot_count(self, count):
+        count = max(1, count)
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", "end"))
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+
+    def _on_resize(self, event):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # Tinggi heading kira-kira satu baris; sisa tinggi dibagi tinggi baris
+        visible = max(1, event.height // rowheight - 1)
+        if visible + self.buffer_rows != len(self.slots):
+            self._set_slot_count(visible + self.buffer_rows)
+            self.tree.configure(height=visible)
+            self.refresh()
+
+    def set_rows(self, rows, display=None):
+        # rows cukup mendukung len() dan indeks, jadi bisa berupa urutan "malas"
+        self.rows = rows
+        self.display = display
+        if self.selected_index is not None and self.selected_index >= len(rows):
+            self.selected_index = None
+        self.scroll_to(self.offset)
+
+    def scroll_to(self, offset):
+        max_offset = max(0, len(self.rows) - self.page_size)
+        self.offset = min(max(0, offset), max_offset)
+        self.refresh()
+
+    def scroll_pages(self, pages):
+        self.scroll_to(self.offset + pages * self.page_size)
+
+    def _scroll_units(self, units):
+        self.scroll_to(self.offset + units * 3)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.rows)))
+        elif unit == "pages":
+            self.scroll_pages(int(amount))
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    @instrumented("ui.table_refresh")
+    def refresh(self):
+        selected_slot = None
+        for slot_index, item in enumerate(self.slots):
+            data_index = self.offset + slot_index
+            if data_index < len(self.rows):
+                self.tree.item(item, text=str(data_index + 1), values=self._values(data_index))
+                if data_index == self.selected_index:
+                    selected_slot = item
+            else:
+                self.tree.item(item, text="", values=())
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+        else:
+            self.tree.selection_set(())
+
+        total = len(self.rows)
+        last = min(total, self.offset + self.page_size)
+        if total:
+            self.scrollbar.set(self.offset / total, last / total)
+            status = f"Baris {self.offset + 1}-{last} dari {total}"
+        else:
+            self.scrollbar.set(0, 1)
+            status = "Tidak ada data"
+        self.status_label.config(text=status + " (memuat...)" if self.loading else status)
+
+    def refresh_row(self, data_index):
+        # Hanya menggambar ulang satu baris bila baris itu sedang terlihat
+        slot_index = data_index - self.offset
+        if 0 <= slot_index < len(self.slots) and data_index < len(self.rows):
+            self.tree.item(self.slots[slot_index], values=self._values(data_index))
+
+    def refresh_cell(self, data_index, column_index):
+        # Hanya satu sel (mis. Jumlah setelah penjualan) yang digambar ulang
+        slot_index = data_index - self.offset
+        if 0 <= slot_index < len(self.slots) and data_index < len(self.rows):
+            self.tree.set(self.slots[slot_index], self.columns[column_index], self._values(data_index)[column_index])
+
+    def row_inserted(self, data_index):
+        # Dipanggil setelah baris disisipkan ke self.rows: baris yang sedang terlihat dan
+        # pilihan tetap di tempatnya, hanya indeksnya yang bergeser
+        if self.selected_index is not None and self.selected_index >= data_index:
+            self.selected_index += 1
+        if data_index < self.offset:
+            self.offset += 1
+        self.scroll_to(self.offset)
+
+    def row_removed(self, data_index):
+        if self.selected_index == data_index:
+            self.selected_index = None
+        elif self.selected_index is not None and self.selected_index > data_index:
+            self.selected_index -= 1
+        if data_index < self.offset:
+            self.offset -= 1
+        self.scroll_to(self.offset)
+
+    def _values(self, data_index):
+        row = self.rows[data_index]
+        return self.display(row) if self.display else row
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        data_index = self.offset + self.slots.index(selection[0])
+        if data_index < len(self.rows):
+            self.selected_index = data_index
+        else:
+            self.tree.selection_set(())
+
+    def _move_selection(self, step):
+        if not self.rows:
+            return
+        if self.selected_index is None:
+            self.select_index(self.offset)
+        else:
+            self.select_index(min(max(0, self.selected_index + step), len(self.rows) - 1))
+
+    def select_index(self, data_index):
+        self.selected_index = data_index
+        if data_index < self.offset:
+            self.scroll_to(data_index)
+        elif data_index >= self.offset + self.page_size:
+            self.scroll_to(data_index - self.page_size + 1)
+        else:
+            self.refresh()
+
+    def selected_row(self):
+        if self.selected_index is None or self.selected_index >= len(self.rows):
+            return None
+        return self.rows[self.selected_index]
+
+    def selected_values(self):
+        # Nilai dikembalikan sebagai string, sama seperti Treeview.item(..., "values")
+        if self.selected_index is None or self.selected_index >= len(self.rows):
+            return None
+        return tuple(str(value) for value in self.rows[self.selected_index])
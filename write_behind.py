@@ -0,0 +1,129 @@
+import os
+import queue
+import threading
+import time
+
+from instrumentation import metrics
+
+# Jeda (detik) sebelum perubahan ditulis; perubahan yang datang selama jeda ini ikut disimpan
+# dalam flush yang sama. Bisa diatur dengan SALESAPP_FLUSH_INTERVAL.
+DEFAULT_FLUSH_INTERVAL = 0.25
+
+
+class WriteBehindQueue:
+    # Antrean tulis untuk SalesApp: perubahan sudah diterapkan ke InventoryModel di memori, lalu
+    # disimpan oleh satu thread I/O sehingga main loop Tk tidak pernah menunggu disk. Operasi
+    # yang menumpuk digabung dalam satu file_handler.batch(): satu kunci, satu tulis ulang
+    # inventory.csv dan satu append transactions.csv (atau satu commit SQLite) per flush.
+    def __init__(self, file_handler, flush_interval=None):
+        self.file_handler = file_handler
+        if flush_interval is None:
+            flush_interval = float(os.environ.get("SALESAPP_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+        self.flush_interval = flush_interval
+        self.operations = []  # (keterangan, operasi, callback) yang belum disimpan
+        self.in_flight = 0
+        self.flush_requested = False
+        self.closed = False
+        self.flush_count = 0
+        self.last_flush = None  # (waktu selesai, durasi, jumlah operasi)
+        self.condition = threading.Condition()
+        # Hasil dari thread I/O untuk dijalankan di thread Tk (lihat run_callbacks)
+        self.completed = queue.Queue()
+        self.failures = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+
+    def submit(self, description, operation, callback=None):
+        with self.condition:
+            if self.closed:
+                raise ValueError("Antrean tulis sudah ditutup.")
+            self.operations.append((description, operation, callback))
+            self.condition.notify_all()
+
+    def pending_count(self):
+        with self.condition:
+            return len(self.operations) + self.in_flight
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.operations and not self.closed:
+                    self.condition.wait()
+                if not self.operations:
+                    return
+                # Menunggu sebentar agar operasi berikutnya (mis. penjualan beruntun) ikut digabung
+                deadline = time.monotonic() + self.flush_interval
+                while not (self.flush_requested or self.closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch, self.operations = self.operations, []
+                self.in_flight = len(batch)
+                self.flush_requested = False
+            self._write(batch)
+            with self.condition:
+                self.in_flight = 0
+                self.flush_count += 1
+                self.condition.notify_all()
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        results = []
+        try:
+            with metrics.timed("write_behind.flush") as measurement, self.file_handler.batch():
+                measurement.rows = len(batch)
+                for description, operation, callback in batch:
+                    # Operasi yang gagal (mis. stok sudah habis dijual kasir lain) tidak
+                    # membatalkan operasi lain di batch yang sama
+                    try:
+                        results.append((callback, operation()))
+                    except Exception as error:
+                        self.failures.put((description, error))
+        except Exception as error:
+            # Batch gagal ditulis (mis. disk penuh): semua operasi di dalamnya tidak tersimpan
+            for description, _, _ in batch:
+                self.failures.put((description, error))
+            return
+        self.last_flush = (time.time(), time.perf_counter() - start, len(batch))
+        for callback, result in results:
+            if callback is not None:
+                self.completed.put((callback, result))
+
+    def run_callbacks(self):
+        # Dipanggil dari thread Tk: callback yang menyentuh model/tabel dijalankan di sini
+        while True:
+            try:
+                callback, result = self.completed.get_nowait()
+            except queue.Empty:
+                return
+            callback(result)
+
+    def take_failures(self):
+        failures = []
+        while True:
+            try:
+                failures.append(self.failures.get_nowait())
+            except queue.Empty:
+                return failures
+
+    def flush(self, timeout=None):
+        # Menunggu sampai semua operasi yang sudah masuk selesai disimpan
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            while self.operations or self.in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            self.flush_requested = False
+        return True
+
+    def close(self):
+        # Saat aplikasi ditutup: seluruh antrean disimpan dulu sebelum thread I/O berhenti
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()